@@ -0,0 +1,169 @@
+"""
+===============================================================================
+  功能描述:
+      coordinate_transform 的性能与精度回归测试
+      - 所有坐标系两两转换：标量函数 与 convert() 批量函数在不同批量下的 点/秒
+      - 往返误差统计：src -> dst -> src 后与原坐标的偏差（米），平均 / P99 / 最大
+      - 保存基线（--save-baseline），之后每次运行与基线比较，性能下降或误差变大即报回归
+
+  用法示例:
+      python benchmark_coordinate_transform.py --save-baseline     # 记录基线
+      python benchmark_coordinate_transform.py                     # 与基线比较，有回归时返回码为 1
+      python benchmark_coordinate_transform.py --quick             # 小批量快速检查
+===============================================================================
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import coordinate_transform as ct
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+BATCH_SIZES = (1_000, 100_000, 1_000_000)
+QUICK_BATCH_SIZES = (1_000, 10_000)
+SCALAR_POINTS = 2_000
+DEG_TO_M = 111319.49
+
+
+def sample_points(n, seed=42):
+    """在中国范围内均匀采样 WGS84 点"""
+    rng = np.random.default_rng(seed)
+    return rng.uniform(73.0, 135.0, n), rng.uniform(18.0, 53.0, n)
+
+
+def coords_in(system, lng_w, lat_w):
+    """把 WGS84 样本转换成 system 坐标系下的坐标元组（作为转换的输入）"""
+    return tuple(ct.convert('wgs84', system, lng_w, lat_w))
+
+
+def _throughput(func, n, min_time=0.2):
+    """重复调用 func 直到累计耗时超过 min_time，返回 点/秒"""
+    repeat, elapsed = 0, 0.0
+    while elapsed < min_time:
+        start_time = time.perf_counter()
+        func()
+        elapsed += time.perf_counter() - start_time
+        repeat += 1
+    return n * repeat / elapsed
+
+
+def bench_scalar(src, dst, coords):
+    """标量函数（如 wgs84_to_bd09）逐点调用的 点/秒"""
+    func = getattr(ct, f'{src}_to_{dst}')
+    points = list(zip(*(c[:SCALAR_POINTS].tolist() for c in coords)))
+
+    def run():
+        for p in points:
+            func(*p)
+    return _throughput(run, len(points))
+
+
+def bench_batch(src, dst, coords, size):
+    """convert() 批量转换的 点/秒"""
+    args = [c[:size] for c in coords]
+    zone = args[2] if src == 'cgcs2000_3deg' else None
+    return _throughput(lambda: ct.convert(src, dst, args[0], args[1], zone=zone), size)
+
+
+def roundtrip_error(src, dst, coords):
+    """src -> dst -> src 往返误差（米）的统计"""
+    zone = coords[2] if src == 'cgcs2000_3deg' else None
+    forward = ct.convert(src, dst, coords[0], coords[1], zone=zone)
+    back_zone = forward[2] if dst == 'cgcs2000_3deg' else None
+    back = ct.convert(dst, src, forward[0], forward[1], zone=back_zone)
+    if src == 'cgcs2000_3deg':
+        err = np.hypot(back[0] - coords[0], back[1] - coords[1])
+    else:
+        err = np.hypot((back[0] - coords[0]) * np.cos(np.radians(coords[1])), back[1] - coords[1]) * DEG_TO_M
+    return {'mean': float(err.mean()), 'p99': float(np.percentile(err, 99)), 'max': float(err.max())}
+
+
+def run_suite(sizes, error_points=100_000):
+    """运行全部测试，返回 {'src->dst': {'scalar': ..., 'batch': {size: ...}, 'roundtrip': {...}}}"""
+    lng_w, lat_w = sample_points(max(max(sizes), error_points))
+    inputs = {system: coords_in(system, lng_w, lat_w) for system in ct.SYSTEMS}
+    results = {}
+    for src in ct.SYSTEMS:
+        for dst in ct.SYSTEMS:
+            if src == dst:
+                continue
+            key = f'{src}->{dst}'
+            coords = inputs[src]
+            results[key] = {
+                'scalar': bench_scalar(src, dst, coords),
+                'batch': {str(size): bench_batch(src, dst, coords, size) for size in sizes},
+                'roundtrip': roundtrip_error(src, dst, tuple(c[:error_points] for c in coords)),
+            }
+            row = results[key]
+            batch = '  '.join(f'{int(s):>9,}: {v:>12,.0f}' for s, v in row['batch'].items())
+            print(f"{key:<30} 标量 {row['scalar']:>10,.0f} 点/秒 | 批量 {batch} | "
+                  f"往返误差 平均 {row['roundtrip']['mean']:.2e} m 最大 {row['roundtrip']['max']:.2e} m")
+    return results
+
+
+def compare(results, baseline, speed_tolerance=0.2, error_tolerance=0.1):
+    """
+    与基线比较，返回回归列表
+      - 点/秒 低于基线的 (1 - speed_tolerance) 倍视为性能回归
+      - 往返最大误差超过基线的 (1 + error_tolerance) 倍（且超过 1 微米）视为精度回归
+    """
+    regressions = []
+    for key, row in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        speeds = [('scalar', row['scalar'], base['scalar'])]
+        speeds += [(f'batch {size}', v, base['batch'][size]) for size, v in row['batch'].items() if size in base['batch']]
+        for label, value, ref in speeds:
+            if value < ref * (1 - speed_tolerance):
+                regressions.append(f'{key} {label}: {value:,.0f} 点/秒 < 基线 {ref:,.0f} 点/秒')
+        err, ref = row['roundtrip']['max'], base['roundtrip']['max']
+        if err > ref * (1 + error_tolerance) and err - ref > 1e-6:
+            regressions.append(f'{key} 往返最大误差: {err:.3e} m > 基线 {ref:.3e} m')
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='coordinate_transform 性能与精度回归测试')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='基线文件路径')
+    parser.add_argument('--save-baseline', action='store_true', help='把本次结果保存为基线')
+    parser.add_argument('--quick', action='store_true', help='只测小批量')
+    parser.add_argument('--speed-tolerance', type=float, default=0.2, help='允许的性能下降比例，默认 0.2')
+    parser.add_argument('--error-tolerance', type=float, default=0.1, help='允许的误差增长比例，默认 0.1')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sizes = QUICK_BATCH_SIZES if args.quick else BATCH_SIZES
+
+    print("=" * 70)
+    print(f"coordinate_transform 基准测试，批量大小 {sizes}")
+    print("=" * 70)
+    results = run_suite(sizes)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n基线已保存到 {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print("\n未找到基线文件，使用 --save-baseline 生成")
+        sys.exit(0)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.speed_tolerance, args.error_tolerance)
+    print("\n" + "=" * 70)
+    if regressions:
+        print(f"发现 {len(regressions)} 项回归:")
+        for line in regressions:
+            print(f"  ✗ {line}")
+        sys.exit(1)
+    print("✓ 无回归")
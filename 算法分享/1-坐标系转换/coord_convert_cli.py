@@ -0,0 +1,171 @@
+"""
+===============================================================================
+  功能描述:
+      大文件坐标转换命令行工具（CSV / Parquet），基于 coordinate_transform.convert
+      - 按固定行数分块流式读取，内存占用与文件大小无关
+      - 每块的经纬度列走向量化路径转换，多块分发到进程池并行计算
+      - 按原顺序写出结果，并实时输出 行/秒
+
+  用法示例:
+      python coord_convert_cli.py gps.csv gps_bd09.csv --src wgs84 --dst bd09
+      python coord_convert_cli.py in.parquet out.parquet --src gcj02 --dst wgs84 \
+          --lng-col lon --lat-col lat --chunksize 500000 --workers 8
+
+  依赖库: pandas (CSV), pyarrow (Parquet)
+===============================================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from coordinate_transform import SYSTEMS, convert
+
+
+# =========================
+# 分块读取 / 写出
+# =========================
+def _file_format(path, fmt):
+    if fmt != 'auto':
+        return fmt
+    return 'parquet' if path.lower().endswith(('.parquet', '.pq')) else 'csv'
+
+
+def iter_chunks(path, fmt, chunksize):
+    """按 chunksize 行流式读取文件，逐块返回 DataFrame"""
+    if fmt == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("⚠️ 读写 Parquet 需要 pyarrow，使用 pip install pyarrow")
+            raise
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+class ChunkWriter:
+    """按块追加写出 CSV / Parquet"""
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self._writer = None
+        self._first = True
+
+    def write(self, df):
+        if self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# =========================
+# 转换
+# =========================
+def convert_columns(src, dst, lng, lat, zone=None):
+    """
+    转换一块数据的坐标列（进程池中执行，只传输 numpy 数组而不是整个 DataFrame）
+    返回: 目标坐标系的坐标数组元组
+    """
+    return tuple(np.asarray(c) for c in convert(src, dst, lng, lat, zone=zone))
+
+
+def output_columns(args):
+    """目标坐标列名：默认在原列名后加 _{dst}，--inplace 时覆盖原列"""
+    if args.dst == 'cgcs2000_3deg':
+        names = ('x', 'y', 'zone') if not args.inplace else (args.lng_col, args.lat_col, args.zone_col or 'zone')
+    else:
+        names = (args.lng_col, args.lat_col)
+    if args.inplace:
+        return names
+    return tuple(f'{name}_{args.dst}' for name in names)
+
+
+def run(args):
+    in_fmt = _file_format(args.input, args.input_format)
+    out_fmt = _file_format(args.output, args.output_format)
+    if args.src == 'cgcs2000_3deg' and not args.zone_col:
+        raise ValueError('--zone-col is required when --src is cgcs2000_3deg')
+    out_cols = output_columns(args)
+
+    def submit(pool, df):
+        zone = df[args.zone_col].to_numpy() if args.src == 'cgcs2000_3deg' else None
+        lng = df[args.lng_col].to_numpy(dtype=np.float64)
+        lat = df[args.lat_col].to_numpy(dtype=np.float64)
+        if pool is None:
+            return convert_columns(args.src, args.dst, lng, lat, zone)
+        return pool.submit(convert_columns, args.src, args.dst, lng, lat, zone)
+
+    def finish(df, result):
+        if not isinstance(result, tuple):
+            result = result.result()
+        for name, values in zip(out_cols, result):
+            df[name] = values
+        writer.write(df)
+        return len(df)
+
+    writer = ChunkWriter(args.output, out_fmt)
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    # 在途的块数量上限，保证内存占用有界
+    max_pending = max(1, args.workers) * 2
+    pending = []
+    total_rows = 0
+    start_time = time.perf_counter()
+
+    try:
+        for df in iter_chunks(args.input, in_fmt, args.chunksize):
+            pending.append((df, submit(pool, df)))
+            while len(pending) >= max_pending or (pool is None and pending):
+                total_rows += finish(*pending.pop(0))
+                elapsed = time.perf_counter() - start_time
+                print(f"\r已处理 {total_rows:,} 行，{total_rows / max(elapsed, 1e-9):,.0f} 行/秒",
+                      end='', file=sys.stderr)
+        while pending:
+            total_rows += finish(*pending.pop(0))
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"\r完成: {total_rows:,} 行，耗时 {elapsed:.2f} 秒，"
+          f"{total_rows / max(elapsed, 1e-9):,.0f} 行/秒", file=sys.stderr)
+    return total_rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='CSV / Parquet 文件坐标系批量转换')
+    parser.add_argument('input', help='输入文件（.csv / .parquet）')
+    parser.add_argument('output', help='输出文件（.csv / .parquet）')
+    parser.add_argument('--src', required=True, choices=SYSTEMS, help='源坐标系')
+    parser.add_argument('--dst', required=True, choices=SYSTEMS, help='目标坐标系')
+    parser.add_argument('--lng-col', default='lng', help='经度列名（cgcs2000_3deg 为 x 列），默认 lng')
+    parser.add_argument('--lat-col', default='lat', help='纬度列名（cgcs2000_3deg 为 y 列），默认 lat')
+    parser.add_argument('--zone-col', default=None, help='带号列名，--src 为 cgcs2000_3deg 时必填')
+    parser.add_argument('--inplace', action='store_true', help='覆盖原坐标列，默认新增 *_{dst} 列')
+    parser.add_argument('--chunksize', type=int, default=1_000_000, help='每块行数，默认 1000000')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='进程数，1 表示不使用进程池')
+    parser.add_argument('--input-format', default='auto', choices=('auto', 'csv', 'parquet'))
+    parser.add_argument('--output-format', default='auto', choices=('auto', 'csv', 'parquet'))
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run(parse_args())
@@ -0,0 +1,313 @@
+"""
+===============================================================================
+  功能描述:
+      基于 asyncio 的本地坐标转换 HTTP 服务（仅依赖标准库 + numpy）
+      - 并发的单点请求按 (src, dst) 合并成微批，等待时间不超过 batch_window（默认 2 毫秒）
+        或凑满 max_batch 个点后，一次性走 coordinate_transform.convert 向量化转换，再分发结果
+      - 每个接口记录延迟直方图，通过 /metrics 查看
+
+  接口:
+      GET  /convert?src=wgs84&dst=bd09&lng=116.4&lat=39.9        单点（自动合批）
+           src 为 cgcs2000_3deg 时 lng/lat 传 x/y，并附加 zone=带号
+      POST /convert/batch  {"src": "wgs84", "dst": "bd09", "lng": [...], "lat": [...]}
+      GET  /metrics                                              各接口延迟直方图
+
+  用法示例:
+      python coord_service.py --port 8080 --batch-window-ms 2
+      curl "http://127.0.0.1:8080/convert?src=wgs84&dst=gcj02&lng=116.4&lat=39.9"
+===============================================================================
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import math
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from coordinate_transform import SYSTEMS, convert
+
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+ZONE_RANGE = (-60, 60)      # 3 度带带号范围：int((lon + 1.5) / 3)，lon 取 [-180, 180]
+
+
+class Histogram:
+    """固定分桶的直方图，用于统计延迟（毫秒）和批量大小（点）"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS, unit='ms'):
+        self.buckets = buckets
+        self.unit = unit
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """按桶上界估计分位数"""
+        if not self.total:
+            return 0.0
+        rank = q * self.total
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def to_dict(self):
+        labels = [f'<={b}' for b in self.buckets] + [f'>{self.buckets[-1]}']
+        return {
+            'unit': self.unit,
+            'count': self.total,
+            'mean': self.sum / self.total if self.total else 0.0,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class MicroBatcher:
+    """
+    把同一 (src, dst) 的并发单点请求合并成批量转换
+    第一个请求到达后最多等待 batch_window 秒，或凑满 max_batch 个点即开始转换
+    """
+
+    def __init__(self, src, dst, batch_window=0.002, max_batch=4096):
+        self.src = src
+        self.dst = dst
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.batch_sizes = Histogram(buckets=(1, 2, 4, 8, 16, 64, 256, 1024, 4096), unit='points')
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, lng, lat, zone=None):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((lng, lat, zone, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # 队列里已经到达的请求直接带上，不再等待
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    @staticmethod
+    def _fail(batch, exc):
+        for item in batch:
+            if not item[3].done():
+                item[3].set_exception(exc)
+
+    async def _run(self):
+        # 任何异常都只让当前这一批失败，循环本身不能退出，否则之后同一 (src, dst) 的请求会一直挂起
+        while True:
+            batch = []
+            try:
+                batch = await self._collect()
+                self.batch_sizes.observe(len(batch))
+                lng = np.array([item[0] for item in batch], dtype=np.float64)
+                lat = np.array([item[1] for item in batch], dtype=np.float64)
+                zone = np.array([item[2] for item in batch], dtype=np.int64) if self.src == 'cgcs2000_3deg' else None
+                result = [np.asarray(c).tolist() for c in convert(self.src, self.dst, lng, lat, zone=zone)]
+                for i, item in enumerate(batch):
+                    if not item[3].done():
+                        item[3].set_result([c[i] for c in result])
+            except asyncio.CancelledError:
+                for item in batch:
+                    item[3].cancel()
+                raise
+            except Exception as e:
+                self._fail(batch, e)
+
+    def close(self):
+        self._task.cancel()
+
+
+class CoordService:
+    """HTTP 服务：解析请求、路由到接口、记录延迟"""
+
+    def __init__(self, batch_window=0.002, max_batch=4096):
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.batchers = {}
+        self.latency = {}
+
+    def _batcher(self, src, dst):
+        key = (src, dst)
+        if key not in self.batchers:
+            self.batchers[key] = MicroBatcher(src, dst, self.batch_window, self.max_batch)
+        return self.batchers[key]
+
+    @staticmethod
+    def _result_body(dst, coords):
+        """结果中的 NaN / inf（超出定义域）转为 null，保证输出是合法 JSON"""
+        def clean(v):
+            if isinstance(v, list):
+                return [clean(x) for x in v]
+            return None if isinstance(v, float) and not math.isfinite(v) else v
+
+        names = ('x', 'y', 'zone') if dst == 'cgcs2000_3deg' else ('lng', 'lat')
+        return dict(zip(names, (clean(c) for c in coords)))
+
+    @staticmethod
+    def _check_finite(*values):
+        for v in values:
+            if not np.all(np.isfinite(v)):
+                raise ValueError('coordinates must be finite numbers')
+
+    @staticmethod
+    def _check_zone(zone):
+        if not np.all((np.asarray(zone) >= ZONE_RANGE[0]) & (np.asarray(zone) <= ZONE_RANGE[1])):
+            raise ValueError(f'zone must be between {ZONE_RANGE[0]} and {ZONE_RANGE[1]}')
+
+    @staticmethod
+    def _check_systems(src, dst):
+        for name in (src, dst):
+            if name not in SYSTEMS:
+                raise ValueError(f'Invalid coordinate system: {name}')
+
+    async def handle_convert(self, query, body):
+        src, dst = query['src'][0], query['dst'][0]
+        self._check_systems(src, dst)
+        lng, lat = float(query['lng'][0]), float(query['lat'][0])
+        self._check_finite(lng, lat)
+        zone = int(query['zone'][0]) if 'zone' in query else None
+        if src == 'cgcs2000_3deg':
+            if zone is None:
+                raise ValueError('zone is required for cgcs2000_3deg')
+            # 逐个请求校验，避免一个非法带号让同批的其他请求一起失败
+            self._check_zone(zone)
+        coords = await self._batcher(src, dst).submit(lng, lat, zone)
+        return self._result_body(dst, coords)
+
+    async def handle_batch(self, query, body):
+        data = json.loads(body or b'{}')
+        if not isinstance(data, dict):
+            raise TypeError('request body must be a JSON object')
+        src, dst = data['src'], data['dst']
+        self._check_systems(src, dst)
+        lng = np.asarray(data['lng'], dtype=np.float64)
+        lat = np.asarray(data['lat'], dtype=np.float64)
+        self._check_finite(lng, lat)
+        zone = data.get('zone')
+        if zone is not None:
+            zone = np.asarray(zone, dtype=np.int64)
+            self._check_zone(zone)
+        # 大批量转换放到线程池，不阻塞事件循环上的微批处理
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, lambda: convert(src, dst, lng, lat, zone=zone))
+        return self._result_body(dst, [np.asarray(c).tolist() for c in result])
+
+    async def handle_metrics(self, query, body):
+        return {
+            'latency': {path: hist.to_dict() for path, hist in self.latency.items()},
+            'batch_size': {f'{src}->{dst}': b.batch_sizes.to_dict() for (src, dst), b in self.batchers.items()},
+        }
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        routes = {
+            ('GET', '/convert'): self.handle_convert,
+            ('POST', '/convert/batch'): self.handle_batch,
+            ('GET', '/metrics'): self.handle_metrics,
+        }
+        handler = routes.get((method, url.path))
+        if handler is None:
+            return 404, {'error': f'Not found: {method} {url.path}'}
+
+        start_time = time.perf_counter()
+        try:
+            status, payload = 200, await handler(parse_qs(url.query), body)
+        except (KeyError, ValueError, TypeError, OverflowError) as e:
+            status, payload = 400, {'error': f'{type(e).__name__}: {e}'}
+        except Exception as e:
+            status, payload = 500, {'error': f'{type(e).__name__}: {e}'}
+        if url.path != '/metrics':
+            hist = self.latency.setdefault(url.path, Histogram())
+            hist.observe((time.perf_counter() - start_time) * 1000)
+        return status, payload
+
+    async def handle_connection(self, reader, writer):
+        """HTTP/1.1 连接处理，支持 keep-alive"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.dispatch(method, target, body)
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}[status]
+                writer.write(
+                    f'HTTP/1.1 {status} {reason}\r\n'
+                    f'Content-Type: application/json; charset=utf-8\r\n'
+                    f'Content-Length: {len(data)}\r\n'
+                    f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        for batcher in self.batchers.values():
+            batcher.close()
+
+
+async def serve(host='127.0.0.1', port=8080, batch_window=0.002, max_batch=4096):
+    service = CoordService(batch_window, max_batch)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"坐标转换服务已启动: http://{host}:{port}  (合批窗口 {batch_window * 1000:.1f} 毫秒，最大批量 {max_batch})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='坐标转换 HTTP 服务（请求自动合批）')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--batch-window-ms', type=float, default=2.0, help='合批等待时间（毫秒），默认 2')
+    parser.add_argument('--max-batch', type=int, default=4096, help='单批最大点数，默认 4096')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.batch_window_ms / 1000, args.max_batch))
+    except KeyboardInterrupt:
+        pass
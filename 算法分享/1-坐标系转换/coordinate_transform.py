@@ -9,6 +9,7 @@
       - CGCS2000: 三度分带投影坐标       cgcs2000_3deg
 
   依赖库: pyproj (用于 CGCS2000 投影/反投影)
+          numpy  (用于批量向量化转换, 函数名以 _np 结尾)
 ===============================================================================
   版权声明:
       本代码仅用于学习研究和内部系统开发，禁止用于违反国家测绘相关法律法规的用途。
@@ -17,12 +18,20 @@
 """
 
 import math
+import sys
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
 from pyproj import CRS, Transformer   # 仅涉及CGCS2000坐标系时使用(pip install pyproj)
 
 PI = math.pi
 PIX = math.pi * 3000 / 180
 EE = 0.00669342162296594323
 A = 6378245.0
+# 中国范围外包矩形（范围外的点不做 GCJ02 加偏）
+CHINA_LNG_MIN, CHINA_LNG_MAX = 72.004, 137.8347
+CHINA_LAT_MIN, CHINA_LAT_MAX = 0.8293, 55.8271
+TRANSFORMER_CACHE_SIZE = 64     # 三度带 Transformer 缓存上限（中国范围约 22 个带，正反各一）
 
 
 def bd09_to_gcj02(lng, lat):
@@ -42,8 +51,18 @@ def gcj02_to_bd09(lng, lat):
     return lng, lat
 
 
+def out_of_china(lng, lat):
+    """
+    判断点是否在中国范围外（粗略外包矩形）
+    GCJ02 只对国内坐标加偏，国外坐标原样返回
+    """
+    return not (CHINA_LNG_MIN <= lng <= CHINA_LNG_MAX and CHINA_LAT_MIN <= lat <= CHINA_LAT_MAX)
+
+
 def gcj02_to_wgs84(lng, lat):
     """GCJ02 -> WGS84"""
+    if out_of_china(lng, lat):
+        return lng, lat
     dlat = transform_lat(lng - 105.0, lat - 35.0)
     dlng = transform_lng(lng - 105.0, lat - 35.0)
     radlat = lat / 180.0 * PI
@@ -56,8 +75,26 @@ def gcj02_to_wgs84(lng, lat):
     return lng, lat
 
 
+def gcj02_to_wgs84_exact(lng, lat, tol=1e-10, max_iter=30):
+    """
+    GCJ02 -> WGS84 精确反算
+    迭代求解 wgs84_to_gcj02(x) = 目标点，直到残差小于 tol（度）
+    """
+    lng_w, lat_w = lng, lat
+    for _ in range(max_iter):
+        lng_calc, lat_calc = wgs84_to_gcj02(lng_w, lat_w)
+        d_lng, d_lat = lng - lng_calc, lat - lat_calc
+        lng_w += d_lng
+        lat_w += d_lat
+        if abs(d_lng) < tol and abs(d_lat) < tol:
+            break
+    return lng_w, lat_w
+
+
 def wgs84_to_gcj02(lng, lat):
     """WGS84 -> GCJ02"""
+    if out_of_china(lng, lat):
+        return lng, lat
     dlat = transform_lat(lng - 105.0, lat - 35.0)
     dlng = transform_lng(lng - 105.0, lat - 35.0)
     radlat = lat / 180.0 * PI
@@ -133,6 +170,22 @@ def bd09_to_wgs84(lng, lat):
     return lng, lat
 
 
+def bd09_to_wgs84_exact(lng, lat, tol=1e-10, max_iter=30):
+    """
+    BD09 -> WGS84 精确反算
+    以 bd09_to_wgs84 的结果为初值，迭代求解 wgs84_to_bd09(x) = 目标点
+    """
+    lng_w, lat_w = bd09_to_wgs84(lng, lat)
+    for _ in range(max_iter):
+        lng_calc, lat_calc = wgs84_to_bd09(lng_w, lat_w)
+        d_lng, d_lat = lng - lng_calc, lat - lat_calc
+        lng_w += d_lng
+        lat_w += d_lat
+        if abs(d_lng) < tol and abs(d_lat) < tol:
+            break
+    return lng_w, lat_w
+
+
 def wgs84_to_bd09(lng, lat):
     """WGS84 -> BD09"""
     lng, lat = wgs84_to_gcj02(lng, lat)
@@ -175,6 +228,31 @@ def lon_to_3deg_zone(lon):
     """
     return int((lon + 1.5) / 3)
 
+
+@lru_cache(maxsize=TRANSFORMER_CACHE_SIZE)
+def get_3deg_transformer(zone, inverse=False):
+    """
+    获取（并缓存）三度带投影的 Transformer
+    构建 CRS/Transformer 需要毫秒级时间，按 (zone, inverse) 缓存后重复使用。
+    lru_cache 自身线程安全且有容量上限；pyproj >= 3.1 的 Transformer 可跨线程共享。
+
+    参数:
+      - zone: 带号
+      - inverse: False 为 WGS84 -> 三度带XY，True 为 三度带XY -> WGS84
+    """
+    lon0 = int(zone) * 3.0  # 中央经线（度）
+    # 构建目标投影（Transverse Mercator / Gauss-Kruger, 三度带）
+    proj4 = (
+        f"+proj=tmerc +lat_0=0 +lon_0={lon0} +k=1.0 "
+        f"+x_0=500000 +y_0=0 +a=6378137.0 +rf=298.257222101 +units=m +no_defs"
+    )
+    crs_wgs84 = CRS.from_epsg(4326)     # WGS84 geographic
+    crs_zone = CRS.from_proj4(proj4)    # CGCS2000-like 3deg zone
+    if inverse:
+        return Transformer.from_crs(crs_zone, crs_wgs84, always_xy=True)
+    return Transformer.from_crs(crs_wgs84, crs_zone, always_xy=True)
+
+
 def wgs84_to_cgcs2000_3deg(lon, lat):
     """
     把 WGS84 lon/lat (degrees) 投影到 CGCS2000 的对应 3°带（返回 x(easting), y(northing)）
@@ -183,15 +261,7 @@ def wgs84_to_cgcs2000_3deg(lon, lat):
       - 使用参数：k=1.0, false_easting=500000, a=6378137.0, rf=298.257222101（CGCS2000椭球）
     """
     zone = lon_to_3deg_zone(lon)
-    lon0 = zone * 3.0  # 中央经线（度）
-    # 构建目标投影（Transverse Mercator / Gauss-Kruger, 三度带）
-    proj4 = (
-        f"+proj=tmerc +lat_0=0 +lon_0={lon0} +k=1.0 "
-        f"+x_0=500000 +y_0=0 +a=6378137.0 +rf=298.257222101 +units=m +no_defs"
-    )
-    crs_src = CRS.from_epsg(4326)       # WGS84 geographic
-    crs_tgt = CRS.from_proj4(proj4)     # CGCS2000-like 3deg zone
-    transformer = Transformer.from_crs(crs_src, crs_tgt, always_xy=True)
+    transformer = get_3deg_transformer(zone)
     x, y = transformer.transform(lon, lat)
     # 注意：有的工程会采用 x = zone*1e6 + easting 的方式返回全区东距，如需此格式可以如下：
     # x = zone * 1_000_000 + x
@@ -209,14 +279,7 @@ def cgcs2000_3deg_to_wgs84(x, y, zone, has_zone_million=False):
     if has_zone_million:
         x = x - zone * 1_000_000
 
-    lon0 = zone * 3.0
-    proj4 = (
-        f"+proj=tmerc +lat_0=0 +lon_0={lon0} +k=1.0 "
-        f"+x_0=500000 +y_0=0 +a=6378137.0 +rf=298.257222101 +units=m +no_defs"
-    )
-    crs_src = CRS.from_proj4(proj4)
-    crs_tgt = CRS.from_epsg(4326)   # WGS84
-    transformer = Transformer.from_crs(crs_src, crs_tgt, always_xy=True)
+    transformer = get_3deg_transformer(zone, inverse=True)
     lon, lat = transformer.transform(x, y)
     return lon, lat
 
@@ -285,5 +348,611 @@ def mapbar_to_cgcs2000_3deg(lon, lat):
     return x, y, zone
 
 
+# =============================================================================
+#  NumPy 向量化版本
+#  与上面的标量函数一一对应，输入可以是标量、列表或 numpy 数组，返回 float64 数组。
+#  计算公式与运算顺序保持与标量版本一致，结果逐点相同（BD09 相关函数中 numpy 与 math 的
+#  三角函数实现可能相差 1 个 ulp，即 1e-13 度量级）。
+# =============================================================================
+
+def _as_array(lng, lat):
+    """把输入统一为 float64 数组（已是 float64 数组时不复制）"""
+    lng = np.asarray(lng, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    return np.broadcast_arrays(lng, lat)
+
+
+def transform_lat_np(lng, lat):
+    """GCJ02 latitude transformation (向量化)"""
+    lng, lat = _as_array(lng, lat)
+    ret = -100 + 2.0 * lng + 3.0 * lat + 0.2 * lat * lat + 0.1 * lng * lat + 0.2 * np.sqrt(np.fabs(lng))
+    ret += (20.0 * np.sin(6.0 * lng * PI) + 20.0 * np.sin(2.0 * lng * PI)) * 2.0 / 3.0
+    ret += (20.0 * np.sin(lat * PI) + 40.0 * np.sin(lat / 3.0 * PI)) * 2.0 / 3.0
+    ret += (160.0 * np.sin(lat / 12.0 * PI) + 320.0 * np.sin(lat * PI / 30.0)) * 2.0 / 3.0
+    return ret
+
+
+def transform_lng_np(lng, lat):
+    """GCJ02 longtitude transformation (向量化)"""
+    lng, lat = _as_array(lng, lat)
+    ret = 300.0 + lng + 2.0 * lat + 0.1 * lng * lng + 0.1 * lng * lat + 0.1 * np.sqrt(np.fabs(lng))
+    ret += (20.0 * np.sin(6.0 * lng * PI) + 20.0 * np.sin(2.0 * lng * PI)) * 2.0 / 3.0
+    ret += (20.0 * np.sin(lng * PI) + 40.0 * np.sin(lng / 3.0 * PI)) * 2.0 / 3.0
+    ret += (150.0 * np.sin(lng / 12.0 * PI) + 300.0 * np.sin(lng / 30.0 * PI)) * 2.0 / 3.0
+    return ret
+
+
+def _gcj02_offset_np(lng, lat):
+    """计算 (lng, lat) 处的 GCJ02 偏移量 (dlng, dlat)，单位：度"""
+    dlat = transform_lat_np(lng - 105.0, lat - 35.0)
+    dlng = transform_lng_np(lng - 105.0, lat - 35.0)
+    radlat = lat / 180.0 * PI
+    magic = np.sin(radlat)
+    magic = 1 - EE * magic * magic
+    sqrtmagic = np.sqrt(magic)
+    dlat = (dlat * 180.0) / ((A * (1 - EE)) / (magic * sqrtmagic) * PI)
+    dlng = (dlng * 180.0) / (A / sqrtmagic * np.cos(radlat) * PI)
+    return dlng, dlat
+
+
+def bd09_to_gcj02_np(lng, lat):
+    """BD09 -> GCJ02 (向量化)"""
+    lng, lat = _as_array(lng, lat)
+    x, y = lng - 0.0065, lat - 0.006
+    z = np.sqrt(x * x + y * y) - 0.00002 * np.sin(y * PIX)
+    theta = np.arctan2(y, x) - 0.000003 * np.cos(x * PIX)
+    return z * np.cos(theta), z * np.sin(theta)
+
+
+def gcj02_to_bd09_np(lng, lat):
+    """GCJ02 -> BD09 (向量化)"""
+    lng, lat = _as_array(lng, lat)
+    z = np.sqrt(lng * lng + lat * lat) + 0.00002 * np.sin(lat * PIX)
+    theta = np.arctan2(lat, lng) + 0.000003 * np.cos(lng * PIX)
+    return z * np.cos(theta) + 0.0065, z * np.sin(theta) + 0.006
+
+
+def in_china_np(lng, lat):
+    """判断点是否在中国范围内 (向量化)，返回 bool 数组，与 out_of_china 相反"""
+    return (lng >= CHINA_LNG_MIN) & (lng <= CHINA_LNG_MAX) & (lat >= CHINA_LAT_MIN) & (lat <= CHINA_LAT_MAX)
+
+
+def _apply_gcj02_offset_np(lng, lat, sign):
+    """
+    对国内的点加上 (sign=1) 或减去 (sign=-1) GCJ02 偏移量，国外的点原样返回
+    先用外包矩形批量筛选，只有国内的点才计算三角函数偏移
+    """
+    lng, lat = _as_array(lng, lat)
+    mask = in_china_np(lng, lat)
+    if mask.all():
+        dlng, dlat = _gcj02_offset_np(lng, lat)
+        return lng + sign * dlng, lat + sign * dlat
+
+    lng_out, lat_out = lng.copy(), lat.copy()
+    if mask.any():
+        dlng, dlat = _gcj02_offset_np(lng[mask], lat[mask])
+        lng_out[mask] += sign * dlng
+        lat_out[mask] += sign * dlat
+    return lng_out, lat_out
+
+
+def gcj02_to_wgs84_np(lng, lat):
+    """GCJ02 -> WGS84 (向量化)"""
+    return _apply_gcj02_offset_np(lng, lat, -1)
+
+
+def wgs84_to_gcj02_np(lng, lat):
+    """WGS84 -> GCJ02 (向量化)"""
+    return _apply_gcj02_offset_np(lng, lat, 1)
+
+
+def mapbar_to_wgs84_np(lng, lat):
+    """MapBar -> WGS84 (向量化)"""
+    lng, lat = _as_array(lng, lat)
+    lng = lng * 100000.0 % 36000000
+    lat = lat * 100000.0 % 36000000
+    lng1 = np.trunc(lng - np.cos(lat / 100000.0) * lng / 18000.0 - np.sin(lng / 100000.0) * lat / 9000.0)
+    lat1 = np.trunc(lat - np.sin(lat / 100000.0) * lng / 18000.0 - np.cos(lng / 100000.0) * lat / 9000.0)
+    lng2 = np.trunc(lng - np.cos(lat1 / 100000.0) * lng1 / 18000.0 - np.sin(lng1 / 100000.0) * lat1 / 9000.0 + np.where(lng > 0, 1, -1))
+    lat2 = np.trunc(lat - np.sin(lat1 / 100000.0) * lng1 / 18000.0 - np.cos(lng1 / 100000.0) * lat1 / 9000.0 + np.where(lat > 0, 1, -1))
+    return lng2 / 100000.0, lat2 / 100000.0
+
+
+def _iterative_inverse_np(forward, lng_t, lat_t, lng_0, lat_0, max_iter, tol, return_info):
+    """
+    通用的向量化迭代反算：求 x 使 forward(x) = 目标值 t。
+    迭代 x <- x + (t - forward(x))，相当于雅可比矩阵取单位阵的牛顿迭代，
+    适用于偏移量随坐标变化很慢的加偏函数（GCJ02、BD09、MapBar）。
+    每轮只对尚未收敛的点计算，已收敛的点从活动集中移除。
+    """
+    shape = lng_t.shape
+    lng_t, lat_t = lng_t.ravel(), lat_t.ravel()
+    lng_x = np.array(lng_0, dtype=np.float64).ravel()
+    lat_x = np.array(lat_0, dtype=np.float64).ravel()
+    converged = np.zeros(lng_t.size, dtype=bool)
+    n_iter = np.zeros(lng_t.size, dtype=np.int64)
+    active = np.arange(lng_t.size)
+
+    for it in range(1, max_iter + 1):
+        if active.size == 0:
+            break
+        lng_calc, lat_calc = forward(lng_x[active], lat_x[active])
+
+        # 误差
+        d_lng = lng_t[active] - lng_calc
+        d_lat = lat_t[active] - lat_calc
+
+        # 更新（一步步修正）
+        lng_x[active] += d_lng
+        lat_x[active] += d_lat
+        n_iter[active] = it
+
+        # 收敛判定，已收敛的点移出活动集
+        done = (np.abs(d_lng) < tol) & (np.abs(d_lat) < tol)
+        converged[active[done]] = True
+        active = active[~done]
+
+    lng_x, lat_x = lng_x.reshape(shape), lat_x.reshape(shape)
+    if return_info:
+        return lng_x, lat_x, converged.reshape(shape), n_iter.reshape(shape)
+    return lng_x, lat_x
+
+
+def wgs84_to_mapbar_np(lng_w, lat_w, max_iter=20, tol=1e-7, return_info=False):
+    """
+    反求 MapBar 坐标：WGS84 -> MapBar (向量化)
+    与 wgs84_to_mapbar 相同的迭代 x <- x + (目标 - f(x))，相当于雅可比矩阵取单位阵的牛顿迭代
+    （mapbar_to_wgs84 的偏移对坐标的导数约为 1e-4 量级）。
+    每轮只对尚未收敛的点计算，已收敛的点从活动集中移除。
+
+    注意：mapbar_to_wgs84 会截断到 1e-5 度，目标点不在该网格上时残差无法小于 tol=1e-7，
+    这类点会跑满 max_iter 并标记为未收敛；如只需网格精度，可传入 tol=1e-5。
+
+    参数:
+      - return_info: 为 True 时额外返回 converged（bool 数组）和 n_iter（每个点的迭代次数）
+    返回: lng, lat 或 lng, lat, converged, n_iter
+    """
+    lng_w, lat_w = _as_array(lng_w, lat_w)
+    return _iterative_inverse_np(mapbar_to_wgs84_np, lng_w, lat_w, lng_w, lat_w,
+                                 max_iter, tol, return_info)
+
+
+def gcj02_to_wgs84_exact_np(lng, lat, tol=1e-10, max_iter=30, return_info=False):
+    """
+    GCJ02 -> WGS84 精确反算 (向量化)
+    gcj02_to_wgs84 用 GCJ02 点处的偏移量近似 WGS84 点处的偏移量，误差为米级；
+    这里迭代求解 wgs84_to_gcj02(x) = 目标点，直到残差小于 tol（度，1e-10 度约 0.01 毫米）。
+
+    参数:
+      - tol: 收敛阈值（度）
+      - max_iter: 最大迭代次数，通常 3~4 次即可收敛
+      - return_info: 为 True 时额外返回 converged 和 n_iter
+    """
+    lng, lat = _as_array(lng, lat)
+    return _iterative_inverse_np(wgs84_to_gcj02_np, lng, lat, lng, lat,
+                                 max_iter, tol, return_info)
+
+
+def bd09_to_wgs84_exact_np(lng, lat, tol=1e-10, max_iter=30, return_info=False):
+    """
+    BD09 -> WGS84 精确反算 (向量化)
+    以 bd09_to_wgs84 的结果为初值，迭代求解 wgs84_to_bd09(x) = 目标点。
+    参数同 gcj02_to_wgs84_exact_np。
+    """
+    lng, lat = _as_array(lng, lat)
+    lng_0, lat_0 = bd09_to_wgs84_np(lng, lat)
+    return _iterative_inverse_np(wgs84_to_bd09_np, lng, lat, lng_0, lat_0,
+                                 max_iter, tol, return_info)
+
+
+def bd09_to_wgs84_np(lng, lat):
+    """BD09 -> WGS84 (向量化)"""
+    return gcj02_to_wgs84_np(*bd09_to_gcj02_np(lng, lat))
+
+
+def wgs84_to_bd09_np(lng, lat):
+    """WGS84 -> BD09 (向量化)"""
+    return gcj02_to_bd09_np(*wgs84_to_gcj02_np(lng, lat))
+
+
+def mapbar_to_gcj02_np(lng, lat):
+    """MapBar -> GCJ02 (向量化)"""
+    return wgs84_to_gcj02_np(*mapbar_to_wgs84_np(lng, lat))
+
+
+def gcj02_to_mapbar_np(lng, lat):
+    """GCJ02 -> MapBar (向量化)"""
+    return wgs84_to_mapbar_np(*gcj02_to_wgs84_np(lng, lat))
+
+
+def mapbar_to_bd09_np(lng, lat):
+    """MapBar -> BD09 (向量化)"""
+    return wgs84_to_bd09_np(*mapbar_to_wgs84_np(lng, lat))
+
+
+def bd09_to_mapbar_np(lng, lat):
+    """BD09 -> MapBar (向量化)"""
+    return wgs84_to_mapbar_np(*bd09_to_wgs84_np(lng, lat))
+
+
+def lon_to_3deg_zone_np(lon):
+    """确定三度带号 (向量化)，返回 int64 数组"""
+    return np.trunc((np.asarray(lon, dtype=np.float64) + 1.5) / 3).astype(np.int64)
+
+
+def wgs84_to_cgcs2000_3deg_np(lon, lat):
+    """
+    WGS84 -> CGCS2000 三度带 XY (向量化)
+    按带号分组，同一带内的点只调用一次 Transformer。
+    返回: x, y, zone 三个数组
+    """
+    lon, lat = _as_array(lon, lat)
+    zone = lon_to_3deg_zone_np(lon)
+    x = np.empty(lon.shape, dtype=np.float64)
+    y = np.empty(lon.shape, dtype=np.float64)
+    for z in np.unique(zone):
+        mask = zone == z
+        x[mask], y[mask] = get_3deg_transformer(int(z)).transform(lon[mask], lat[mask])
+    return x, y, zone
+
+
+def cgcs2000_3deg_to_wgs84_np(x, y, zone, has_zone_million=False):
+    """
+    CGCS2000 三度带 XY -> WGS84 (向量化)
+    zone 可以是单个带号，也可以是与 x, y 等长的带号数组；按带号分组调用 Transformer。
+    返回: lon, lat
+    """
+    x, y = _as_array(x, y)
+    zone = np.broadcast_to(np.asarray(zone, dtype=np.int64), x.shape)
+    if has_zone_million:
+        x = x - zone * 1_000_000
+
+    lon = np.empty(x.shape, dtype=np.float64)
+    lat = np.empty(x.shape, dtype=np.float64)
+    for z in np.unique(zone):
+        mask = zone == z
+        lon[mask], lat[mask] = get_3deg_transformer(int(z), inverse=True).transform(x[mask], y[mask])
+    return lon, lat
+
+
+def cgcs2000_3deg_to_gcj02_np(x, y, zone, has_zone_million=False):
+    """CGCS2000 三度带 XY -> GCJ02 (向量化)"""
+    return wgs84_to_gcj02_np(*cgcs2000_3deg_to_wgs84_np(x, y, zone, has_zone_million))
+
+
+def gcj02_to_cgcs2000_3deg_np(lon, lat):
+    """GCJ02 -> CGCS2000 三度带 XY (向量化)"""
+    return wgs84_to_cgcs2000_3deg_np(*gcj02_to_wgs84_np(lon, lat))
+
+
+def cgcs2000_3deg_to_bd09_np(x, y, zone, has_zone_million=False):
+    """CGCS2000 三度带 XY -> BD09 (向量化)"""
+    return wgs84_to_bd09_np(*cgcs2000_3deg_to_wgs84_np(x, y, zone, has_zone_million))
+
+
+def bd09_to_cgcs2000_3deg_np(lon, lat):
+    """BD09 -> CGCS2000 三度带 XY (向量化)"""
+    return wgs84_to_cgcs2000_3deg_np(*bd09_to_wgs84_np(lon, lat))
+
+
+def cgcs2000_3deg_to_mapbar_np(x, y, zone, has_zone_million=False):
+    """CGCS2000 三度带 XY -> MapBar (向量化)"""
+    return wgs84_to_mapbar_np(*cgcs2000_3deg_to_wgs84_np(x, y, zone, has_zone_million))
+
+
+def mapbar_to_cgcs2000_3deg_np(lon, lat):
+    """MapBar -> CGCS2000 三度带 XY (向量化)"""
+    return wgs84_to_cgcs2000_3deg_np(*mapbar_to_wgs84_np(lon, lat))
+
+
+
+# =============================================================================
+#  通用转换入口：坐标系注册表 + 最短路径 + 组合流水线
+# =============================================================================
+
+SYSTEMS = ('wgs84', 'gcj02', 'bd09', 'mapbar', 'cgcs2000_3deg')
+
+# 直接转换关系（图的边），其余坐标系对通过最短路径组合得到
+# cgcs2000_3deg 的坐标为 (x, y, zone)，其余坐标系为 (lng, lat)
+CONVERSION_EDGES = {
+    ('wgs84', 'gcj02'): wgs84_to_gcj02_np,
+    ('gcj02', 'wgs84'): gcj02_to_wgs84_np,
+    ('gcj02', 'bd09'): gcj02_to_bd09_np,
+    ('bd09', 'gcj02'): bd09_to_gcj02_np,
+    ('wgs84', 'mapbar'): wgs84_to_mapbar_np,
+    ('mapbar', 'wgs84'): mapbar_to_wgs84_np,
+    ('wgs84', 'cgcs2000_3deg'): wgs84_to_cgcs2000_3deg_np,
+    ('cgcs2000_3deg', 'wgs84'): cgcs2000_3deg_to_wgs84_np,
+}
 
 
+def register_conversion(src, dst, func):
+    """
+    注册（或替换）一条直接转换关系
+    func 接收源坐标系的坐标数组，返回目标坐标系的坐标数组元组
+    """
+    CONVERSION_EDGES[(src, dst)] = func
+    find_path.cache_clear()
+    get_pipeline.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def find_path(src, dst):
+    """
+    广度优先搜索 src -> dst 的最短转换路径
+    返回: 经过的坐标系元组，例如 ('bd09', 'gcj02', 'wgs84', 'mapbar')
+    """
+    systems = {s for edge in CONVERSION_EDGES for s in edge}
+    for name in (src, dst):
+        if name not in systems:
+            raise ValueError(f'Invalid coordinate system: {name}')
+
+    previous = {src: None}
+    queue = [src]
+    while queue:
+        node = queue.pop(0)
+        if node == dst:
+            break
+        for a, b in CONVERSION_EDGES:
+            if a == node and b not in previous:
+                previous[b] = node
+                queue.append(b)
+
+    if dst not in previous:
+        raise ValueError(f'No conversion path: {src} -> {dst}')
+    path = [dst]
+    while previous[path[-1]] is not None:
+        path.append(previous[path[-1]])
+    return tuple(reversed(path))
+
+
+@lru_cache(maxsize=None)
+def get_pipeline(src, dst):
+    """
+    把 src -> dst 最短路径上的各步转换组合成一个函数，并按 (src, dst) 缓存
+    组合后的函数直接把上一步的数组元组传给下一步，中间不再构造标量或元组列表
+    """
+    path = find_path(src, dst)
+    steps = tuple(CONVERSION_EDGES[edge] for edge in zip(path[:-1], path[1:]))
+
+    def pipeline(*coords):
+        for step in steps:
+            coords = step(*coords)
+        return coords
+
+    pipeline.__name__ = f'{src}_to_{dst}_pipeline'
+    pipeline.path = path
+    return pipeline
+
+
+def convert(src, dst, lng, lat, zone=None, has_zone_million=False):
+    """
+    任意两个坐标系之间的批量转换
+
+    参数:
+      - src, dst: 坐标系名称，见 SYSTEMS
+      - lng, lat: 经纬度（src 为 cgcs2000_3deg 时为平面坐标 x, y），标量或数组
+      - zone: src 为 cgcs2000_3deg 时的带号（标量或数组）
+      - has_zone_million: src 为 cgcs2000_3deg 且 x 含带号前缀（zone*1e6）时为 True
+    返回:
+      dst 为 cgcs2000_3deg 时返回 x, y, zone，否则返回 lng, lat
+
+    # >>> convert('bd09', 'mapbar', 116.41, 39.91)
+    """
+    lng, lat = _as_array(lng, lat)
+    if src == 'cgcs2000_3deg':
+        if zone is None:
+            raise ValueError('zone is required for cgcs2000_3deg')
+        if has_zone_million:
+            lng = lng - np.asarray(zone) * 1_000_000
+        coords = (lng, lat, zone)
+    else:
+        coords = (lng, lat)
+    if src == dst:
+        return coords
+    return get_pipeline(src, dst)(*coords)
+
+
+# =============================================================================
+#  轨迹转换与差分压缩
+# =============================================================================
+
+DeltaTrajectory = namedtuple('DeltaTrajectory', ['lng0', 'lat0', 't0', 'd_lng', 'd_lat', 'd_t', 'scale'])
+
+
+def _smallest_int(values):
+    """差分值能放进 int32 时用 int32 存储，否则用 int64"""
+    info = np.iinfo(np.int32)
+    if values.size == 0 or (values.min() >= info.min and values.max() <= info.max):
+        return values.astype(np.int32)
+    return values
+
+
+def encode_trajectory_delta(lng, lat, timestamps=None, scale=1_000_000):
+    """
+    轨迹差分编码：坐标量化为整数（默认微度，约 0.1 米），首点存绝对值，其余点存与前一点的差值
+    相邻轨迹点很近，差值很小，用 int32 存储即可，体积约为 float64 的一半，压缩后更小
+
+    参数:
+      - lng, lat: 轨迹坐标数组（按时间顺序）
+      - timestamps: 时间戳数组（整数，或 numpy datetime64），可为 None；浮点时间戳请先换算为整数（如毫秒）
+      - scale: 量化倍数，1e6 表示微度
+    返回: DeltaTrajectory
+    """
+    lng = np.asarray(lng, dtype=np.float64).ravel()
+    lat = np.asarray(lat, dtype=np.float64).ravel()
+    if lng.size != lat.size:
+        raise ValueError('lng and lat must have the same length')
+    if lng.size == 0:
+        raise ValueError('Empty trajectory')
+    # NaN / inf 转 int64 会得到无意义的值，差分后无法还原
+    if not (np.isfinite(lng).all() and np.isfinite(lat).all()):
+        raise ValueError('coordinates must be finite')
+    q_lng = np.round(lng * scale).astype(np.int64)
+    q_lat = np.round(lat * scale).astype(np.int64)
+
+    t0, d_t = None, None
+    if timestamps is not None:
+        t = np.asarray(timestamps).ravel()
+        if t.size != lng.size:
+            raise ValueError('timestamps must have the same length as the trajectory')
+        if np.issubdtype(t.dtype, np.datetime64):
+            t = t.astype('datetime64[ms]')
+        elif not np.issubdtype(t.dtype, np.integer):
+            raise TypeError(f'timestamps must be integers or datetime64, got {t.dtype}')
+        t = t.astype(np.int64)
+        t0, d_t = int(t[0]), _smallest_int(np.diff(t))
+
+    return DeltaTrajectory(int(q_lng[0]), int(q_lat[0]), t0,
+                           _smallest_int(np.diff(q_lng)), _smallest_int(np.diff(q_lat)), d_t, scale)
+
+
+def decode_trajectory_delta(encoded):
+    """
+    轨迹差分解码，encode_trajectory_delta 的逆运算
+    返回: lng, lat, timestamps（编码时没有时间戳则为 None；datetime64 时间戳解码为毫秒整数）
+    """
+    def restore(first, deltas):
+        values = np.empty(len(deltas) + 1, dtype=np.int64)
+        values[0] = first
+        np.cumsum(deltas, out=values[1:])
+        values[1:] += first
+        return values
+
+    lng = restore(encoded.lng0, encoded.d_lng) / encoded.scale
+    lat = restore(encoded.lat0, encoded.d_lat) / encoded.scale
+    timestamps = None if encoded.t0 is None else restore(encoded.t0, encoded.d_t)
+    return lng, lat, timestamps
+
+
+def convert_trajectory(src, dst, lng, lat, timestamps=None, delta=False, scale=1_000_000):
+    """
+    整条轨迹一次性向量化转换
+
+    参数:
+      - src, dst: 坐标系名称（见 SYSTEMS，不支持 cgcs2000_3deg）
+      - lng, lat: 轨迹坐标数组
+      - timestamps: 时间戳数组，可为 None，原样返回或参与差分编码
+      - delta: 为 True 时返回差分编码后的 DeltaTrajectory，便于存储和传输
+    返回: (lng, lat, timestamps) 或 DeltaTrajectory
+    """
+    if 'cgcs2000_3deg' in (src, dst):
+        raise ValueError('convert_trajectory does not support cgcs2000_3deg')
+    lng, lat = _as_array(lng, lat)
+    if timestamps is not None and len(timestamps) != lng.size:
+        raise ValueError('timestamps must have the same length as the trajectory')
+    lng, lat = convert(src, dst, lng, lat)
+    if delta:
+        return encode_trajectory_delta(lng, lat, timestamps, scale)
+    return lng, lat, timestamps
+
+
+# =============================================================================
+#  缓冲区协议接口（零拷贝读入，结果写入调用方提供的缓冲区）
+# =============================================================================
+
+def _float64_view(buf, writable=False):
+    """把任意支持缓冲区协议的对象（numpy、array.array('d')、bytearray、Arrow Buffer 等）视为 float64 数组，不复制"""
+    if isinstance(buf, np.ndarray):
+        if not buf.flags.c_contiguous:
+            raise ValueError('Buffer must be C-contiguous')
+        arr = buf.reshape(-1)
+    else:
+        view = memoryview(buf)
+        if not view.c_contiguous:
+            raise ValueError('Buffer must be C-contiguous')
+        # np.frombuffer 不看缓冲区自身的格式：只接受 float64，或无类型的字节缓冲区（bytearray、Arrow Buffer 等）
+        fmt = view.format.lstrip('@=')
+        if fmt not in ('d', 'B', 'b', 'c') and not (fmt == '<d' and sys.byteorder == 'little'):
+            raise TypeError(f"Buffer must hold float64 values, got format '{view.format}'")
+        arr = np.frombuffer(buf, dtype=np.float64)
+    if arr.dtype != np.float64:
+        raise TypeError(f'Buffer must hold float64 values, got {arr.dtype}')
+    if writable and not arr.flags.writeable:
+        raise ValueError('Output buffer is read-only')
+    return arr
+
+
+def _check_buffer_systems(src, dst):
+    if 'cgcs2000_3deg' in (src, dst):
+        raise ValueError('Buffer conversion does not support cgcs2000_3deg')
+
+
+def convert_interleaved(src, dst, coords, out=None):
+    """
+    转换交错存储的坐标缓冲区 [lng0, lat0, lng1, lat1, ...]
+
+    参数:
+      - coords: 支持缓冲区协议的 float64 缓冲区，长度为偶数
+      - out: 输出缓冲区（同样布局），为 None 时新建 numpy 数组；传入 coords 本身即原地转换
+    返回: 输出缓冲区对应的 numpy 数组视图
+    """
+    _check_buffer_systems(src, dst)
+    src_arr = _float64_view(coords)
+    if src_arr.size % 2:
+        raise ValueError('Interleaved buffer must have an even number of values')
+    out_arr = np.empty_like(src_arr) if out is None else _float64_view(out, writable=True)
+    if out_arr.size != src_arr.size:
+        raise ValueError('Output buffer size does not match input')
+
+    pairs = src_arr.reshape(-1, 2)
+    lng, lat = convert(src, dst, pairs[:, 0], pairs[:, 1])
+    out_pairs = out_arr.reshape(-1, 2)
+    out_pairs[:, 0] = lng
+    out_pairs[:, 1] = lat
+    return out_arr
+
+
+def convert_into(src, dst, lng, lat, out_lng=None, out_lat=None):
+    """
+    转换分列存储的坐标缓冲区
+
+    参数:
+      - lng, lat: 支持缓冲区协议的 float64 缓冲区
+      - out_lng, out_lat: 输出缓冲区，为 None 时新建；传入 lng, lat 本身即原地转换
+    返回: 输出缓冲区对应的 numpy 数组视图 (lng, lat)
+    """
+    _check_buffer_systems(src, dst)
+    lng_arr, lat_arr = _float64_view(lng), _float64_view(lat)
+    if lng_arr.size != lat_arr.size:
+        raise ValueError('lng and lat buffers must have the same length')
+    out_lng = np.empty_like(lng_arr) if out_lng is None else _float64_view(out_lng, writable=True)
+    out_lat = np.empty_like(lat_arr) if out_lat is None else _float64_view(out_lat, writable=True)
+    if out_lng.size != lng_arr.size or out_lat.size != lat_arr.size:
+        raise ValueError('Output buffer size does not match input')
+
+    new_lng, new_lat = convert(src, dst, lng_arr, lat_arr)
+    out_lng[...] = new_lng
+    out_lat[...] = new_lat
+    return out_lng, out_lat
+
+if __name__ == "__main__":
+    import time
+
+    # 精确反算 vs 一步近似：精度与吞吐量对比
+    print("=" * 70)
+    print("GCJ02/BD09 -> WGS84：一步近似 vs 迭代精确反算")
+    print("=" * 70)
+
+    rng = np.random.default_rng(42)
+    n = 1_000_000
+    lng_w = rng.uniform(73.0, 135.0, n)
+    lat_w = rng.uniform(18.0, 53.0, n)
+    deg_to_m = 111319.49  # 1 度约 111 km，用于把误差换算成米
+
+    cases = [
+        ("GCJ02", wgs84_to_gcj02_np(lng_w, lat_w), gcj02_to_wgs84_np, gcj02_to_wgs84_exact_np),
+        ("BD09", wgs84_to_bd09_np(lng_w, lat_w), bd09_to_wgs84_np, bd09_to_wgs84_exact_np),
+    ]
+    for name, (lng_s, lat_s), one_step, exact in cases:
+        print(f"\n[{name}] {n} 个点")
+        for label, func in (("一步近似", one_step), ("精确反算", exact)):
+            start_time = time.time()
+            lng_r, lat_r = func(lng_s, lat_s)
+            elapsed = time.time() - start_time
+            err = np.hypot(lng_r - lng_w, lat_r - lat_w) * deg_to_m
+            print(f"  {label}: 耗时 {elapsed:.3f} 秒 ({n / elapsed:,.0f} 点/秒)，"
+                  f"误差 平均 {err.mean():.2e} m，最大 {err.max():.2e} m")
+
+    _, _, converged, n_iter = gcj02_to_wgs84_exact_np(*cases[0][1], return_info=True)
+    print(f"\nGCJ02 精确反算：收敛 {converged.mean():.2%}，平均迭代 {n_iter.mean():.2f} 次，最多 {n_iter.max()} 次")
@@ -0,0 +1,182 @@
+"""
+===============================================================================
+  功能描述:
+      GCJ02 偏移量查表模式：预计算偏移量表并内存映射，批量插值代替逐点三角函数计算
+
+      GCJ02 偏移量可以拆成“只与经度有关的项 + 只与纬度有关的项 + 交叉项”：
+          dlat = (a(lng) + c(lat) + 0.1*x*y) * k_lat(lat)
+          dlng = (b(lng) + 300 + 2*y + 0.1*x*y) * k_lng(lat)        (x = lng-105, y = lat-35)
+      a/b/c 中包含全部 sin/sqrt 项，k_lat/k_lng 为纬度方向的椭球系数，均只依赖一个坐标。
+      因此只需沿经度、纬度两个方向各建一张一维表（步长 1e-4 度，共约 30 MB），
+      线性插值误差在 0.1 毫米量级；若直接建二维 dlat/dlng 网格，要达到亚厘米精度需要
+      数 GB 的存储。
+
+  用法示例:
+      build_offset_grid('gcj02_offset_grid')            # 只需执行一次
+      grid = GCJ02OffsetGrid('gcj02_offset_grid')
+      lng, lat = grid.wgs84_to_gcj02(lng, lat)
+      grid.install()                                    # convert() 中的 wgs84<->gcj02 改用查表
+===============================================================================
+"""
+
+import json
+import os
+
+import numpy as np
+
+from coordinate_transform import (A, CHINA_LAT_MAX, CHINA_LAT_MIN, CHINA_LNG_MAX, CHINA_LNG_MIN, EE, PI,
+                                  _as_array, gcj02_to_wgs84_np, in_china_np, register_conversion,
+                                  wgs84_to_gcj02_np)
+
+GRID_STEP = 1e-4    # 表的步长（度）
+DEFAULT_GRID_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gcj02_offset_grid')
+
+
+def _axis(v_min, v_max, step):
+    """覆盖 [v_min, v_max] 的等间距节点"""
+    n = int(np.ceil((v_max - v_min) / step)) + 2
+    return v_min + np.arange(n) * step
+
+
+def build_offset_grid(path=DEFAULT_GRID_PATH, step=GRID_STEP):
+    """
+    预计算偏移量表并保存到目录 path（lng.npy、lat.npy、meta.json）
+
+    lng.npy: [a(lng), b(lng)]，lat.npy: [c(lat), k_lat(lat), k_lng(lat)]
+    """
+    os.makedirs(path, exist_ok=True)
+
+    lng = _axis(CHINA_LNG_MIN, CHINA_LNG_MAX, step)
+    x = lng - 105.0
+    s6 = (20.0 * np.sin(6.0 * x * PI) + 20.0 * np.sin(2.0 * x * PI)) * 2.0 / 3.0
+    a = 2.0 * x + 0.2 * np.sqrt(np.fabs(x)) + s6
+    b = x + 0.1 * x * x + 0.1 * np.sqrt(np.fabs(x)) + s6
+    b += (20.0 * np.sin(x * PI) + 40.0 * np.sin(x / 3.0 * PI)) * 2.0 / 3.0
+    b += (150.0 * np.sin(x / 12.0 * PI) + 300.0 * np.sin(x / 30.0 * PI)) * 2.0 / 3.0
+
+    lat = _axis(CHINA_LAT_MIN, CHINA_LAT_MAX, step)
+    y = lat - 35.0
+    c = -100 + 3.0 * y + 0.2 * y * y
+    c += (20.0 * np.sin(y * PI) + 40.0 * np.sin(y / 3.0 * PI)) * 2.0 / 3.0
+    c += (160.0 * np.sin(y / 12.0 * PI) + 320.0 * np.sin(y * PI / 30.0)) * 2.0 / 3.0
+    radlat = lat / 180.0 * PI
+    magic = np.sin(radlat)
+    magic = 1 - EE * magic * magic
+    sqrtmagic = np.sqrt(magic)
+    k_lat = 180.0 / ((A * (1 - EE)) / (magic * sqrtmagic) * PI)
+    k_lng = 180.0 / (A / sqrtmagic * np.cos(radlat) * PI)
+
+    np.save(os.path.join(path, 'lng.npy'), np.column_stack([a, b]))
+    np.save(os.path.join(path, 'lat.npy'), np.column_stack([c, k_lat, k_lng]))
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({'step': step, 'lng_min': lng[0], 'lat_min': lat[0]}, f)
+    return path
+
+
+def _interp(table, origin, step, v):
+    """沿一个坐标轴线性插值，返回 (len(v), 列数) 的数组"""
+    t = (v - origin) / step
+    i = np.clip(np.floor(t).astype(np.intp), 0, len(table) - 2)
+    f = (t - i)[:, None]
+    # np.take 按行批量取数，比二维花式索引 table[i] 快得多
+    lo = np.take(table, i, axis=0)
+    hi = np.take(table, i + 1, axis=0)
+    return lo + (hi - lo) * f
+
+
+class GCJ02OffsetGrid:
+    """
+    内存映射的 GCJ02 偏移量表
+    多个进程打开同一份表时通过操作系统页缓存共享内存
+    """
+
+    def __init__(self, path=DEFAULT_GRID_PATH):
+        if not os.path.exists(os.path.join(path, 'meta.json')):
+            raise FileNotFoundError(f'offset grid not found: {path}, run build_offset_grid() first')
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.step = meta['step']
+        self.lng_min = meta['lng_min']
+        self.lat_min = meta['lat_min']
+        self.lng_table = np.load(os.path.join(path, 'lng.npy'), mmap_mode='r')
+        self.lat_table = np.load(os.path.join(path, 'lat.npy'), mmap_mode='r')
+
+    def _offsets(self, lng, lat):
+        """查表计算 (lng, lat) 处的偏移量，要求点在中国范围内"""
+        ab = _interp(self.lng_table, self.lng_min, self.step, lng)
+        ck = _interp(self.lat_table, self.lat_min, self.step, lat)
+        xy = 0.1 * (lng - 105.0) * (lat - 35.0)
+        dlat = (ab[:, 0] + ck[:, 0] + xy) * ck[:, 1]
+        dlng = (ab[:, 1] + 300.0 + 2.0 * (lat - 35.0) + xy) * ck[:, 2]
+        return dlng, dlat
+
+    def _apply(self, lng, lat, sign):
+        lng, lat = _as_array(lng, lat)
+        shape = lng.shape
+        lng_out, lat_out = lng.astype(np.float64).ravel(), lat.astype(np.float64).ravel()
+        mask = in_china_np(lng_out, lat_out)
+        if mask.all():
+            dlng, dlat = self._offsets(lng_out, lat_out)
+            return (lng_out + sign * dlng).reshape(shape), (lat_out + sign * dlat).reshape(shape)
+        if mask.any():
+            dlng, dlat = self._offsets(lng_out[mask], lat_out[mask])
+            lng_out[mask] += sign * dlng
+            lat_out[mask] += sign * dlat
+        return lng_out.reshape(shape), lat_out.reshape(shape)
+
+    def wgs84_to_gcj02(self, lng, lat):
+        """WGS84 -> GCJ02 (查表)"""
+        return self._apply(lng, lat, 1)
+
+    def gcj02_to_wgs84(self, lng, lat):
+        """GCJ02 -> WGS84 (查表，与 gcj02_to_wgs84 相同的一步近似)"""
+        return self._apply(lng, lat, -1)
+
+    def install(self):
+        """让 coordinate_transform.convert 的 wgs84<->gcj02 改用查表"""
+        register_conversion('wgs84', 'gcj02', self.wgs84_to_gcj02)
+        register_conversion('gcj02', 'wgs84', self.gcj02_to_wgs84)
+
+    @staticmethod
+    def uninstall():
+        """恢复精确公式"""
+        register_conversion('wgs84', 'gcj02', wgs84_to_gcj02_np)
+        register_conversion('gcj02', 'wgs84', gcj02_to_wgs84_np)
+
+
+if __name__ == "__main__":
+    import time
+
+    if not os.path.exists(os.path.join(DEFAULT_GRID_PATH, 'meta.json')):
+        print("生成偏移量表...")
+        start_time = time.time()
+        build_offset_grid()
+        print(f"  耗时 {time.time() - start_time:.2f} 秒，保存到 {DEFAULT_GRID_PATH}")
+    grid = GCJ02OffsetGrid()
+
+    rng = np.random.default_rng(42)
+    n = 1_000_000
+    lng_w = rng.uniform(CHINA_LNG_MIN, CHINA_LNG_MAX, n)
+    lat_w = rng.uniform(CHINA_LAT_MIN, CHINA_LAT_MAX, n)
+    deg_to_m = 111319.49
+
+    print("=" * 70)
+    print(f"精度报告：查表 vs 精确公式（WGS84 -> GCJ02，{n} 个点）")
+    print("=" * 70)
+    lng_e, lat_e = wgs84_to_gcj02_np(lng_w, lat_w)
+    lng_g, lat_g = grid.wgs84_to_gcj02(lng_w, lat_w)
+    err = np.hypot((lng_g - lng_e) * np.cos(np.radians(lat_w)), lat_g - lat_e) * deg_to_m
+    print(f"  误差 平均 {err.mean():.2e} m，P99 {np.percentile(err, 99):.2e} m，最大 {err.max():.2e} m")
+
+    print("\n" + "=" * 70)
+    print("性能对比")
+    print("=" * 70)
+    for size in (1, 100, 10_000, 1_000_000):
+        lng_s, lat_s = lng_w[:size], lat_w[:size]
+        repeat = max(3, 10_000 // size)
+        for label, func in (("精确公式", wgs84_to_gcj02_np), ("查表插值", grid.wgs84_to_gcj02)):
+            start_time = time.perf_counter()
+            for _ in range(repeat):
+                func(lng_s, lat_s)
+            elapsed = (time.perf_counter() - start_time) / repeat
+            print(f"  批量 {size:>9,}  {label}: 每批 {elapsed * 1e6:10.1f} 微秒，{size / elapsed:14,.0f} 点/秒")
@@ -0,0 +1,187 @@
+"""
+===============================================================================
+  功能描述:
+      超大批量坐标转换的多进程执行器，基于 coordinate_transform.convert
+      - 把数组切分成若干分片，分发到进程池并行转换
+      - 输入/输出数组放在共享内存中，子进程按名称挂载，不需要 pickle 传输数组
+      - 数据量低于阈值时直接在当前进程转换
+      - 各点的转换互相独立，结果与进程数、分片大小无关
+
+  用法示例:
+      with ParallelConverter(workers=8) as pc:
+          lng, lat = pc.convert('wgs84', 'bd09', lng, lat)
+
+      lng, lat = convert_parallel('wgs84', 'bd09', lng, lat)
+===============================================================================
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from coordinate_transform import convert
+
+MIN_PARALLEL_SIZE = 200_000     # 少于该点数时不启用多进程
+SHARDS_PER_WORKER = 4           # 每个进程分到的分片数，便于负载均衡
+
+
+def _attach(spec):
+    """按 (共享内存名, dtype, 长度) 挂载共享内存并返回 (shm, 数组视图)"""
+    name, dtype, size = spec
+    shm = SharedMemory(name=name)
+    return shm, np.ndarray((size,), dtype=dtype, buffer=shm.buf)
+
+
+def _convert_shard(src, dst, in_specs, out_specs, start, stop):
+    """子进程：转换 [start, stop) 区间，结果直接写入输出共享内存"""
+    shms = []
+    try:
+        inputs = []
+        for spec in in_specs:
+            shm, arr = _attach(spec)
+            shms.append(shm)
+            inputs.append(arr[start:stop])
+        outputs = []
+        for spec in out_specs:
+            shm, arr = _attach(spec)
+            shms.append(shm)
+            outputs.append(arr[start:stop])
+
+        zone = inputs[2] if len(inputs) == 3 else None
+        result = convert(src, dst, inputs[0], inputs[1], zone=zone)
+        for out, values in zip(outputs, result):
+            out[...] = values
+        # 释放视图后才能关闭共享内存
+        del inputs, outputs, arr
+    finally:
+        for shm in shms:
+            shm.close()
+    return stop - start
+
+
+class ParallelConverter:
+    """
+    多进程坐标转换执行器，进程池在多次调用之间复用
+
+    参数:
+      - workers: 进程数，默认 CPU 核数
+      - min_parallel_size: 少于该点数时在当前进程直接转换
+      - shard_size: 分片大小，默认按 workers * SHARDS_PER_WORKER 均分
+    """
+
+    def __init__(self, workers=None, min_parallel_size=MIN_PARALLEL_SIZE, shard_size=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_size = min_parallel_size
+        self.shard_size = shard_size
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _shards(self, n):
+        shard_size = self.shard_size or -(-n // (self.workers * SHARDS_PER_WORKER))
+        return [(start, min(start + shard_size, n)) for start in range(0, n, shard_size)]
+
+    def convert(self, src, dst, lng, lat, zone=None):
+        """
+        批量转换，参数与返回值同 coordinate_transform.convert（不支持 has_zone_million，
+        需要时请先减去 zone*1e6）
+        """
+        lng = np.asarray(lng, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        if lng.shape != lat.shape:
+            raise ValueError('lng and lat must have the same shape')
+        # 内部按一维处理，返回前恢复输入的形状
+        shape = lng.shape
+        lng, lat = lng.ravel(), lat.ravel()
+        n = lng.size
+        if src == 'cgcs2000_3deg':
+            if zone is None:
+                raise ValueError('zone is required for cgcs2000_3deg')
+            zone = np.ascontiguousarray(np.broadcast_to(zone, shape), dtype=np.int64).ravel()
+        if n < self.min_parallel_size or self.workers <= 1:
+            return tuple(np.asarray(c).reshape(shape) for c in convert(src, dst, lng, lat, zone=zone))
+
+        inputs = [lng, lat]
+        if src == 'cgcs2000_3deg':
+            inputs.append(zone)
+        out_dtypes = [np.float64, np.float64]
+        if dst == 'cgcs2000_3deg':
+            out_dtypes.append(np.int64)
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        shms = []
+        try:
+            in_specs = []
+            for arr in inputs:
+                shm = SharedMemory(create=True, size=max(arr.nbytes, 1))
+                shms.append(shm)
+                np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+                in_specs.append((shm.name, arr.dtype.str, n))
+            out_specs = []
+            for dtype in out_dtypes:
+                shm = SharedMemory(create=True, size=max(np.dtype(dtype).itemsize * n, 1))
+                shms.append(shm)
+                out_specs.append((shm.name, np.dtype(dtype).str, n))
+
+            futures = [self._pool.submit(_convert_shard, src, dst, in_specs, out_specs, start, stop)
+                       for start, stop in self._shards(n)]
+            for future in futures:
+                future.result()
+
+            # 从共享内存复制出结果，之后即可释放共享内存
+            result = tuple(
+                np.ndarray((n,), dtype=dtype, buffer=shm.buf).reshape(shape).copy()
+                for dtype, shm in zip(out_dtypes, shms[len(inputs):])
+            )
+        finally:
+            for shm in shms:
+                shm.close()
+                shm.unlink()
+        return result
+
+
+def convert_parallel(src, dst, lng, lat, zone=None, workers=None, min_parallel_size=MIN_PARALLEL_SIZE):
+    """一次性的多进程批量转换，频繁调用时请直接复用 ParallelConverter"""
+    with ParallelConverter(workers, min_parallel_size) as pc:
+        return pc.convert(src, dst, lng, lat, zone=zone)
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(42)
+    n = 5_000_000
+    lng_w = rng.uniform(73.0, 135.0, n)
+    lat_w = rng.uniform(18.0, 53.0, n)
+
+    print("=" * 70)
+    print(f"WGS84 -> BD09 多进程转换，{n} 个点")
+    print("=" * 70)
+
+    start_time = time.time()
+    expected = convert('wgs84', 'bd09', lng_w, lat_w)
+    base = time.time() - start_time
+    print(f"单进程:   {base:.3f} 秒 ({n / base:,.0f} 点/秒)")
+
+    for workers in (2, 4, 8):
+        with ParallelConverter(workers=workers) as pc:
+            pc.convert('wgs84', 'bd09', lng_w[:pc.min_parallel_size], lat_w[:pc.min_parallel_size])  # 预热进程池
+            start_time = time.time()
+            result = pc.convert('wgs84', 'bd09', lng_w, lat_w)
+            elapsed = time.time() - start_time
+        same = all(np.array_equal(a, b) for a, b in zip(result, expected))
+        print(f"{workers} 进程:   {elapsed:.3f} 秒 ({n / elapsed:,.0f} 点/秒)，"
+              f"快 {base / elapsed:.1f}x，结果一致: {same}")
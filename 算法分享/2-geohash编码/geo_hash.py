@@ -1,11 +1,20 @@
 from __future__ import division
 from collections import namedtuple
+from functools import lru_cache
 from builtins import range
 import decimal
 import math
 
+import numpy as np
+
 base32 = '0123456789bcdefghjkmnpqrstuvwxyz'
 
+# 返回值类型在模块级定义一次，避免每次调用都创建新的 namedtuple 类
+SouthWest = namedtuple('SouthWest', ['lat', 'lon'])
+NorthEast = namedtuple('NorthEast', ['lat', 'lon'])
+Bounds = namedtuple('Bounds', ['sw', 'ne'])
+Point = namedtuple('Point', ['lat', 'lon'])
+
 
 def _indexes(geohash):
     if not geohash:
@@ -32,12 +41,13 @@ def _fixedpoint(num, bound_max, bound_min):
     -------
     小数
     """
-    try:
-        decimal.getcontext().prec = math.floor(2 - math.log10(bound_max
-                                                              - bound_min))
-    except ValueError:
-        decimal.getcontext().prec = 12
-    return decimal.Decimal(num)
+    # 使用局部上下文，不修改全局 decimal 精度（线程安全）
+    with decimal.localcontext() as ctx:
+        try:
+            ctx.prec = math.floor(2 - math.log10(bound_max - bound_min))
+        except ValueError:
+            ctx.prec = 12
+        return decimal.Decimal(num)
 
 
 def bounds(geohash):
@@ -89,12 +99,7 @@ def bounds(geohash):
                     lat_max = lat_mid
             even_bit = not even_bit
 
-    SouthWest = namedtuple('SouthWest', ['lat', 'lon'])
-    NorthEast = namedtuple('NorthEast', ['lat', 'lon'])
-    sw = SouthWest(lat_min, lon_min)
-    ne = NorthEast(lat_max, lon_max)
-    Bounds = namedtuple('Bounds', ['sw', 'ne'])
-    return Bounds(sw, ne)
+    return Bounds(SouthWest(lat_min, lon_min), NorthEast(lat_max, lon_max))
 
 
 def bbox(geohash):
@@ -108,13 +113,14 @@ def bbox(geohash):
     return {'s': sw.lat, 'w': sw.lon, 'n': ne.lat, 'e': ne.lon}
 
 
-def decode(geohash):
+def decode(geohash, exact=False):
     """
     将geohash解码为纬度/经度。位置是单元的大致中心，具有合理的精度。
 
     :param geohash: string, 需要边界的单元格
+    :param exact: 为 True 时返回 decimal.Decimal（与 float 数值相同）
 
-    :returns: 具有十进制lat和lon作为属性的Namedtuple。
+    :returns: 具有lat和lon作为属性的Namedtuple，默认为 float。
 
     # >>> geo_hash.decode('gkkpfve')
     # >>> (70.2995, -27.9993)
@@ -124,43 +130,51 @@ def decode(geohash):
     lat = (lat_min + lat_max) / 2
     lon = (lon_min + lon_max) / 2
 
-    lat = _fixedpoint(lat, lat_max, lat_min)
-    lon = _fixedpoint(lon, lon_max, lon_min)
-    Point = namedtuple('Point', ['lat', 'lon'])
+    if exact:
+        lat = _fixedpoint(lat, lat_max, lat_min)
+        lon = _fixedpoint(lon, lon_max, lon_min)
     return Point(lat, lon)
 
 
-def decode_exactly(geohash):
+def decode_exactly(geohash, exact=False):
     """
     将geohash解码为纬度/经度。位置是单元的大致中心，具有合理的精度。
     
     :param geohash: string, 需要边界的单元格
-    :returns: 具有十进制lat和lon作为属性的Namedtuple。
+    :param exact: 为 True 时 lat、lon 返回 decimal.Decimal
+    :returns: (lat, lon, lat_err, lon_err)
     """
     (lat_min, lon_min), (lat_max, lon_max) = bounds(geohash)
 
     lat = (lat_min + lat_max) / 2
     lon = (lon_min + lon_max) / 2
 
-    lat = _fixedpoint(lat, lat_max, lat_min)
-    lon = _fixedpoint(lon, lon_max, lon_min)
+    if exact:
+        lat = _fixedpoint(lat, lat_max, lat_min)
+        lon = _fixedpoint(lon, lon_max, lon_min)
 
     return lat, lon, (lat_max - lat_min)/2, (lon_max - lon_min)/2
 
 
-def encode(lat, lon, precision):
+def encode(lat, lon, precision, exact=False):
     """
     将纬度、经度编码为地理哈希。
 
-    :param lat: latitude, 纬度，一个可以转换为十进制的数字或字符串。理想情况下，传递一个字符串以避免浮点不确定性。它将被转换为十进制。
-    :param lon: longitude, 经度，一个可以转换为十进制的数字或字符串。理想情况下，传递一个字符串以避免浮点不确定性。它将被转换为十进制。
+    :param lat: latitude, 纬度，一个数字，或可以转换为十进制的字符串。
+    :param lon: longitude, 经度，一个数字，或可以转换为十进制的字符串。
     :param precision: integer, 整数，1到12表示地理哈希级别，最高12。
+    :param exact: 为 True 时使用 decimal.Decimal 逐位二分。字符串/Decimal 输入或 precision 超过 12 时自动使用该模式，
+                  以保留十进制输入的精确值；float 输入默认走整数量化的快速路径，结果与 Decimal 模式逐位相同。
 
     :returns: geohash as string.
 
     # >>> geo_hash.encode('70.2995', '-27.9993', 7)
     # >>> gkkpfve
     """
+    if not (exact or precision < 1 or precision > MAX_INT_PRECISION
+            or isinstance(lat, (str, decimal.Decimal)) or isinstance(lon, (str, decimal.Decimal))):
+        return int_to_geohash(encode_int(lat, lon, precision), precision)
+
     lat = decimal.Decimal(lat)
     lon = decimal.Decimal(lon)
 
@@ -204,6 +218,31 @@ def encode(lat, lon, precision):
     return ''.join(ghash)
 
 
+# 相邻单元格查找表：_NEIGHBOUR[方向][奇偶] 把字符映射为该方向相邻的字符，
+# _BORDER[方向][奇偶] 为位于该方向边界上的字符（越界需要向父单元格进位）
+_NEIGHBOUR_CHARS = {
+    'n': ['p0r21436x8zb9dcf5h7kjnmqesgutwvy',
+          'bc01fg45238967deuvhjyznpkmstqrwx'],
+    's': ['14365h7k9dcfesgujnmqp0r2twvyx8zb',
+          '238967debc01fg45kmstqrwxuvhjyznp'],
+    'e': ['bc01fg45238967deuvhjyznpkmstqrwx',
+          'p0r21436x8zb9dcf5h7kjnmqesgutwvy'],
+    'w': ['238967debc01fg45kmstqrwxuvhjyznp',
+          '14365h7k9dcfesgujnmqp0r2twvyx8zb'],
+}
+_NEIGHBOUR = {
+    direction: [{c: base32[i] for i, c in enumerate(chars)} for chars in tables]
+    for direction, tables in _NEIGHBOUR_CHARS.items()
+}
+_BORDER = {
+    'n': [frozenset('prxz'), frozenset('bcfguvyz')],
+    's': [frozenset('028b'), frozenset('0145hjnp')],
+    'e': [frozenset('bcfguvyz'), frozenset('prxz')],
+    'w': [frozenset('0145hjnp'), frozenset('028b')],
+}
+NEIGHBOURS_CACHE_SIZE = 65536
+
+
 def adjacent(geohash, direction):
     """
     确定给定方向上的相邻单元格。
@@ -218,38 +257,30 @@ def adjacent(geohash, direction):
     """
     if not geohash:
         raise ValueError('Invalid geohash')
-    if direction not in ('nsew'):
+    if direction not in _NEIGHBOUR:
         raise ValueError('Invalid direction')
+    neighbour = _NEIGHBOUR[direction]
+    border = _BORDER[direction]
 
-    neighbour = {
-        'n': ['p0r21436x8zb9dcf5h7kjnmqesgutwvy',
-              'bc01fg45238967deuvhjyznpkmstqrwx'],
-        's': ['14365h7k9dcfesgujnmqp0r2twvyx8zb',
-              '238967debc01fg45kmstqrwxuvhjyznp'],
-        'e': ['bc01fg45238967deuvhjyznpkmstqrwx',
-              'p0r21436x8zb9dcf5h7kjnmqesgutwvy'],
-        'w': ['238967debc01fg45kmstqrwxuvhjyznp',
-              '14365h7k9dcfesgujnmqp0r2twvyx8zb'],
-    }
-
-    border = {
-        'n': ['prxz', 'bcfguvyz'],
-        's': ['028b', '0145hjnp'],
-        'e': ['bcfguvyz', 'prxz'],
-        'w': ['0145hjnp', '028b'],
-    }
-
-    last_char = geohash[-1]
-    parent = geohash[:-1]  # parent is hash without last char
-
-    typ = len(geohash) % 2
-
-    # check for edge-cases which don't share common prefix
-    if last_char in border[direction][typ] and parent:
-        parent = adjacent(parent, direction)
-
-    index = neighbour[direction][typ].index(last_char)
-    return parent + base32[index]
+    # 从最后一个字符开始替换，字符在边界上时向前一位进位（迭代代替递归）
+    i = len(geohash) - 1
+    try:
+        last_char = geohash[i]
+        typ = (i + 1) % 2
+        if last_char not in border[typ] or i == 0:
+            return geohash[:i] + neighbour[typ][last_char]
+
+        chars = list(geohash)
+        while True:
+            c = chars[i]
+            chars[i] = neighbour[typ][c]
+            if c not in border[typ] or i == 0:
+                break
+            i -= 1
+            typ ^= 1
+    except KeyError:
+        raise ValueError('Invalid geohash')
+    return ''.join(chars)
 
 
 def neighbours(geohash):
@@ -278,33 +309,371 @@ def neighbours(geohash):
     w = adjacent(geohash, 'w')
     sw = adjacent(s, 'w')
     nw = adjacent(n, 'w')
-    Neighbours = namedtuple('Neighbours',
-                            ['n', 'ne', 'e', 'se', 's', 'sw', 'w', 'nw'])
-    #return Neighbours(n, ne, e, se, s, sw, w, nw)
     return [n, ne, e, se, s, sw, w, nw]
 
 
-def expanding(geohash,num):
+@lru_cache(maxsize=NEIGHBOURS_CACHE_SIZE)
+def neighbours_cached(geohash):
+    """
+    neighbours 的带缓存版本，热点单元格重复查询时直接命中缓存
+    返回 tuple（缓存的结果不可被调用方修改），顺序同 neighbours
+    """
+    return tuple(neighbours(geohash))
+
+
+def _expanding_frontier(geohash, num):
+    '''逐圈扩展：每圈只对上一圈（边界）的格子求 neighbours，返回按圈分组的列表'''
+    rings = [[geohash]]
+    seen = {geohash}
+    for _ in range(num):
+        ring = []
+        for geo in rings[-1]:
+            for t in neighbours(geo):
+                if t not in seen:
+                    seen.add(t)
+                    ring.append(t)
+        rings.append(ring)
+    return rings
+
+
+def expanding(geohash, num, by_ring=False):
     '''
     计算对指定geohash扩num圈后的所有geohash块
+    不超过 12 位时用整数 geohash 的经纬度格号直接生成 (2*num+1)^2 的方块，不再逐个求 neighbours；
+    经纬度方向都循环，结果集合与逐圈调用 neighbours 相同，按圈由内到外排列
 
     :param geohash: geohash块
-    :param num: 扩展圈数
+    :param num: 扩展圈数，小于 0 时按 0 处理（只返回 geohash 自身）
+    :param by_ring: 为 True 时按圈分组返回，第 k 个元素为第 k 圈的 geohash 列表
     :return: 结果列表
     '''
-    if num==0:
-        return [geohash]
-    geo_list={geohash}
+    if not geohash:
+        raise ValueError('Invalid geohash')
+    num = max(num, 0)
+    if len(geohash) > MAX_INT_PRECISION:
+        rings = _expanding_frontier(geohash, num)
+        return rings if by_ring else [geo for ring in rings for geo in ring]
+
+    precision = len(geohash)
+    lon_q, lat_q, n_lon, n_lat = _int_to_cell(geohash_to_int(geohash), precision)
+    d = np.arange(-num, num + 1)
+    d_lon, d_lat = np.meshgrid(d, d)
+    ring = np.maximum(np.abs(d_lon), np.abs(d_lat)).ravel()
+    order = np.argsort(ring, kind='stable')
+    ring = ring[order]
+    lon = (lon_q + d_lon.ravel()[order]) % (1 << n_lon)
+    lat = (lat_q + d_lat.ravel()[order]) % (1 << n_lat)
+    codes = _interleave(lon.astype(np.uint64), lat.astype(np.uint64), precision)
+
+    # 扩展范围超过整个经度/纬度方向时会循环到同一个格子，只保留最内圈的那个
+    _, first = np.unique(codes, return_index=True)
+    keep = np.sort(first)
+    geo_list = _ints_to_strings(codes[keep], precision).tolist()
+    if not by_ring:
+        return geo_list
+    rings = [[] for _ in range(num + 1)]
+    for k, geo in zip(ring[keep].tolist(), geo_list):
+        rings[k].append(geo)
+    return rings
+
+
+# =============================================================================
+#  NumPy 批量编码/解码
+#  经纬度先量化为整数，再用 magic number 位展开把经度、纬度的二进制位交错成一个整数，
+#  最后每 5 位查表得到 base32 字符。最多 12 位 geohash（60 bit），可放进 uint64。
+# =============================================================================
+
+MAX_INT_PRECISION = 12
+
+_BASE32_BYTES = np.frombuffer(base32.encode('ascii'), dtype=np.uint8)
+_BASE32_DECODE = np.full(256, -1, dtype=np.int64)
+_BASE32_DECODE[_BASE32_BYTES] = np.arange(32)
+
+
+def _spread_bits(x):
+    """把整数低 32 位分散到偶数位上：...b2 b1 b0 -> ...0 b2 0 b1 0 b0（Python int 与 uint64 数组通用）"""
+    x = x & 0x00000000FFFFFFFF
+    x = (x | (x << 16)) & 0x0000FFFF0000FFFF
+    x = (x | (x << 8)) & 0x00FF00FF00FF00FF
+    x = (x | (x << 4)) & 0x0F0F0F0F0F0F0F0F
+    x = (x | (x << 2)) & 0x3333333333333333
+    x = (x | (x << 1)) & 0x5555555555555555
+    return x
+
+
+def _compact_bits(x):
+    """_spread_bits 的逆运算：取出偶数位并压缩到低 32 位"""
+    x = x & 0x5555555555555555
+    x = (x | (x >> 1)) & 0x3333333333333333
+    x = (x | (x >> 2)) & 0x0F0F0F0F0F0F0F0F
+    x = (x | (x >> 4)) & 0x00FF00FF00FF00FF
+    x = (x | (x >> 8)) & 0x0000FFFF0000FFFF
+    x = (x | (x >> 16)) & 0x00000000FFFFFFFF
+    return x
+
+
+def _split_bits(precision):
+    """precision 位 geohash 中经度、纬度各占的位数（从经度开始交替）"""
+    nbits = 5 * precision
+    return (nbits + 1) // 2, nbits // 2
+
+
+def _quantize_np(values, v_min, v_max, nbits):
+    """
+    把坐标量化为 [0, 2^nbits) 的整数，结果与 encode 中逐位二分（value >= mid 取 1）完全一致
+    格点 v_min + q*width 都是二进制小数，可被 float64 精确表示，先用浮点除法估计再修正一位即可
+    NaN / inf 没有对应的单元格，抛出 ValueError（与 encode 一致），避免无效定位被归入某个真实单元格
+    """
+    if not np.isfinite(values).all():
+        raise ValueError('coordinates must be finite')
+    n = 1 << nbits
+    width = (v_max - v_min) / n
+    q = np.clip(np.floor((values - v_min) / width), 0, n - 1)
+    q = np.where(values < v_min + q * width, q - 1, q)
+    q = np.where(values >= v_min + (q + 1) * width, q + 1, q)
+    return np.clip(q, 0, n - 1).astype(np.uint64)
+
+
+def _quantize(value, v_min, v_max, nbits):
+    """_quantize_np 的标量版本"""
+    if not math.isfinite(value):
+        raise ValueError('coordinates must be finite')
+    n = 1 << nbits
+    width = (v_max - v_min) / n
+    q = min(max(math.floor((value - v_min) / width), 0), n - 1)
+    if value < v_min + q * width:
+        q -= 1
+    elif value >= v_min + (q + 1) * width:
+        q += 1
+    return min(max(q, 0), n - 1)
+
+
+def _interleave(lon_q, lat_q, precision):
+    """经度、纬度整数交错成 geohash 整数，最高位为经度"""
+    n_lon, n_lat = _split_bits(precision)
+    if n_lon == n_lat:
+        return (_spread_bits(lon_q) << 1) | _spread_bits(lat_q)
+    return _spread_bits(lon_q) | (_spread_bits(lat_q) << 1)
+
+
+def _deinterleave(codes, nbits):
+    """geohash 整数拆回经度、纬度整数；nbits 为总位数（可为数组）"""
+    odd = (nbits % 2) == 1
+    lon_q = np.where(odd, _compact_bits(codes), _compact_bits(codes >> 1))
+    lat_q = np.where(odd, _compact_bits(codes >> 1), _compact_bits(codes))
+    return lon_q, lat_q
+
+
+def _encode_ints_np(lats, lons, precision):
+    """批量编码为 geohash 整数（uint64 数组）"""
+    if not 1 <= precision <= MAX_INT_PRECISION:
+        raise ValueError(f'precision must be between 1 and {MAX_INT_PRECISION}')
+    n_lon, n_lat = _split_bits(precision)
+    lon_q = _quantize_np(np.asarray(lons, dtype=np.float64), -180.0, 180.0, n_lon)
+    lat_q = _quantize_np(np.asarray(lats, dtype=np.float64), -90.0, 90.0, n_lat)
+    return _interleave(lon_q, lat_q, precision)
+
+
+def _ints_to_strings(codes, precision):
+    """geohash 整数数组 -> 字符串数组"""
+    codes = np.asarray(codes, dtype=np.uint64)
+    shifts = np.arange(5 * (precision - 1), -1, -5, dtype=np.uint64)
+    chars = _BASE32_BYTES[(codes[..., None] >> shifts) & np.uint64(31)]
+    return np.ascontiguousarray(chars).view(f'S{precision}')[..., 0].astype(f'U{precision}')
+
+
+def _strings_to_ints(hashes):
+    """字符串数组 -> (geohash 整数数组, 长度数组)"""
+    raw = np.asarray(hashes, dtype='S')
+    if raw.dtype.itemsize > MAX_INT_PRECISION:
+        raise ValueError(f'geohash longer than {MAX_INT_PRECISION} is not supported')
+    raw = np.char.lower(raw)
+    lengths = np.char.str_len(raw).astype(np.uint64)
+    if np.any(lengths == 0):
+        raise ValueError('Invalid geohash')
+    chars = raw.view(np.uint8).reshape(raw.shape + (raw.dtype.itemsize,))
+    values = _BASE32_DECODE[chars]
+    valid = np.arange(chars.shape[-1]) < lengths[..., None].astype(np.int64)
+    if np.any(values[valid] < 0):
+        raise ValueError('Invalid geohash')
 
-    for _ in range(num):
-        for geo in list(geo_list):
-            tmp=neighbours(geo)
-            for t in tmp:
-                geo_list.add(t)
+    codes = np.zeros(raw.shape, dtype=np.uint64)
+    for j in range(chars.shape[-1]):
+        in_hash = valid[..., j]
+        codes = np.where(in_hash, (codes << np.uint64(5)) | values[..., j].clip(0).astype(np.uint64), codes)
+    return codes, lengths
+
+
+def _cell_bounds_np(codes, lengths):
+    """geohash 整数数组 -> 单元格 (lat_min, lon_min, lat_max, lon_max)"""
+    nbits = np.asarray(lengths, dtype=np.int64) * 5
+    n_lon, n_lat = (nbits + 1) // 2, nbits // 2
+    lon_q, lat_q = _deinterleave(np.asarray(codes, dtype=np.uint64), nbits)
+    lon_w = np.ldexp(360.0, -n_lon)
+    lat_w = np.ldexp(180.0, -n_lat)
+    lon_min = -180.0 + lon_q * lon_w
+    lat_min = -90.0 + lat_q * lat_w
+    return lat_min, lon_min, lat_min + lat_w, lon_min + lon_w
+
+
+def encode_many(lats, lons, precision):
+    """
+    批量将纬度、经度编码为地理哈希（与逐个调用 encode 的结果一致）
+
+    :param lats: 纬度数组
+    :param lons: 经度数组
+    :param precision: integer, 1到12
+
+    :returns: geohash 字符串的 numpy 数组
+
+    # >>> geo_hash.encode_many([70.2995, 39.9], [-27.9993, 116.4], 7)
+    # >>> ['gkkpfve' 'wx4fbxx']
+    """
+    return _ints_to_strings(_encode_ints_np(lats, lons, precision), precision)
+
+
+def bounds_many(hashes):
+    """
+    批量计算 geohash 边界，结果与 bounds 逐个计算相同
+
+    :param hashes: geohash 字符串数组，长度可以不同（最长 12 位）
+    :returns: (lat_min, lon_min, lat_max, lon_max) 四个 float64 数组
+    """
+    return _cell_bounds_np(*_strings_to_ints(hashes))
+
+
+def decode_many(hashes):
+    """
+    批量将地理哈希解码为单元格中心的纬度、经度（float64，数值与 decode 相同）
+
+    :param hashes: geohash 字符串列表或数组，长度可以不同
+
+    :returns: (lats, lons) 两个 numpy 数组
+    """
+    lat_min, lon_min, lat_max, lon_max = bounds_many(hashes)
+    return (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+
+
+# =============================================================================
+#  整数 geohash：把 precision 位 geohash 的 5*precision 个二进制位存成一个整数
+#  （批量时为 uint64 数组，8 字节/个），与字符串可无损互转。
+#  前缀关系即整数右移：parent = code >> 5；同一前缀下的单元格是连续的整数区间。
+#  整数本身不记录位数，precision 需由调用方保存（通常整个索引使用同一精度）。
+# =============================================================================
+
+def geohash_to_int(geohash):
+    """
+    字符串 geohash -> 整数
+
+    # >>> geo_hash.geohash_to_int('ezs42')
+    # >>> 14672002
+    """
+    code = 0
+    for index in _indexes(geohash.lower()):
+        code = (code << 5) | index
+    return code
+
+
+def int_to_geohash(code, precision):
+    """整数 -> 字符串 geohash"""
+    return ''.join(base32[(code >> (5 * i)) & 31] for i in range(precision - 1, -1, -1))
+
+
+def encode_int(lat, lon, precision):
+    """
+    将纬度、经度编码为整数 geohash，等价于 geohash_to_int(encode(lat, lon, precision))
+
+    :param lat: 纬度
+    :param lon: 经度
+    :param precision: integer, 1到12
+    """
+    if not 1 <= precision <= MAX_INT_PRECISION:
+        raise ValueError(f'precision must be between 1 and {MAX_INT_PRECISION}')
+    n_lon, n_lat = _split_bits(precision)
+    return _interleave(_quantize(lon, -180.0, 180.0, n_lon), _quantize(lat, -90.0, 90.0, n_lat), precision)
+
+
+def _int_to_cell(code, precision):
+    """整数 geohash -> (经度格号, 纬度格号, 经度位数, 纬度位数)"""
+    n_lon, n_lat = _split_bits(precision)
+    if n_lon == n_lat:
+        return _compact_bits(code >> 1), _compact_bits(code), n_lon, n_lat
+    return _compact_bits(code), _compact_bits(code >> 1), n_lon, n_lat
+
+
+def bounds_int(code, precision):
+    """
+    返回整数 geohash 单元格的 SW/NE 边界
+
+    :returns: Bounds(sw(lat, lon), ne(lat, lon))，同 bounds
+    """
+    lon_q, lat_q, n_lon, n_lat = _int_to_cell(code, precision)
+    lon_w = 360.0 / (1 << n_lon)
+    lat_w = 180.0 / (1 << n_lat)
+    lat_min = -90.0 + lat_q * lat_w
+    lon_min = -180.0 + lon_q * lon_w
+    return Bounds(SouthWest(lat_min, lon_min), NorthEast(lat_min + lat_w, lon_min + lon_w))
+
+
+def decode_int(code, precision):
+    """整数 geohash -> 单元格中心 (lat, lon)"""
+    (lat_min, lon_min), (lat_max, lon_max) = bounds_int(code, precision)
+    return (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+
+
+def _cell_offsets(code, precision, offsets):
+    """按 (d_lon, d_lat) 格数平移整数 geohash，经纬度方向都循环（与 adjacent 的行为一致）"""
+    lon_q, lat_q, n_lon, n_lat = _int_to_cell(code, precision)
+    lon_mask, lat_mask = (1 << n_lon) - 1, (1 << n_lat) - 1
+    # 负的偏移先转为模 2^n 下的正数，uint64 数组不能直接加负数
+    return [_interleave((lon_q + (d_lon & lon_mask)) & lon_mask, (lat_q + (d_lat & lat_mask)) & lat_mask, precision)
+            for d_lon, d_lat in offsets]
+
+
+_NEIGHBOUR_OFFSETS = ((0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1))
+
+
+def neighbours_int(code, precision):
+    """
+    返回整数 geohash 的 8 个相邻单元格，顺序同 neighbours：[n, ne, e, se, s, sw, w, nw]
+    code 可以是 uint64 数组，此时每个元素是一个与 code 同形状的数组
+    """
+    return _cell_offsets(code, precision, _NEIGHBOUR_OFFSETS)
+
+
+def parent_int(code, levels=1):
+    """上 levels 级的父单元格（去掉最后 levels 个字符），code 可为 uint64 数组"""
+    return code >> (5 * levels)
+
+
+def children_int(code):
+    """32 个子单元格（追加一个字符），code 为数组时返回形状 (..., 32)"""
+    if isinstance(code, np.ndarray):
+        return (code[..., None] << np.uint64(5)) | np.arange(32, dtype=np.uint64)
+    return [(code << 5) | i for i in range(32)]
+
+
+def encode_int_many(lats, lons, precision):
+    """批量编码为整数 geohash，返回 uint64 数组"""
+    return _encode_ints_np(lats, lons, precision)
+
+
+def geohash_to_int_many(hashes):
+    """字符串 geohash 数组 -> uint64 数组（长度需一致时可直接用于排序、比较）"""
+    return _strings_to_ints(hashes)[0]
 
-    return list(geo_list)
 
+def int_to_geohash_many(codes, precision):
+    """uint64 数组 -> 字符串 geohash 数组"""
+    return _ints_to_strings(codes, precision)
 
 
+def bounds_int_many(codes, precision):
+    """批量计算整数 geohash 的边界，返回 (lat_min, lon_min, lat_max, lon_max) 四个数组"""
+    return _cell_bounds_np(np.asarray(codes, dtype=np.uint64), precision)
 
 
+def decode_int_many(codes, precision):
+    """批量解码整数 geohash，返回单元格中心 (lats, lons)"""
+    lat_min, lon_min, lat_max, lon_max = bounds_int_many(codes, precision)
+    return (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
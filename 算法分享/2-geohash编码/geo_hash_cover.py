@@ -0,0 +1,370 @@
+"""
+===============================================================================
+  功能描述:
+      用 geohash 单元格覆盖圆形 / 矩形 / 多边形区域，基于 geo_hash 的整数 geohash
+      - 从 1 位 geohash 开始逐级细分：完全在区域内的单元格直接保留（粗），完全在区域外的丢弃，
+        与边界相交的继续细分，直到 precision 位 —— 得到内部粗、边缘细的混合精度单元格集合
+      - max_cells 限制单元格总数，超出时单元格停止细分（覆盖范围变大，但仍完整覆盖区域）；
+        min_precision 优先于 max_cells：区域在 min_precision 位（至少 1 位）上需要的单元格数
+        已超过 max_cells 时无法再合并，结果会多于 max_cells
+      - 结果可以直接作为前缀做范围查询，比固定精度 + expanding 猜圈数的查询次数少得多
+      - polyfill 把多边形拆成内部单元格和边界单元格，内部单元格中的点无需再做点在多边形内判断
+
+  用法示例:
+      cover_circle(39.93, 116.39, 2000, precision=7)                 # 半径 2 km 的圆
+      cover_bbox(39.9, 116.3, 40.0, 116.5, precision=6, max_cells=64)
+      cover_polygon([(116.3, 39.9), (116.5, 39.9), (116.4, 40.0)], precision=7)
+      interior, boundary = polyfill([(116.3, 39.9), (116.5, 39.9), (116.4, 40.0)], precision=7)
+
+  说明:
+      圆形按球面距离（haversine，地球平均半径）判断；矩形、多边形在经纬度平面上判断，
+      多边形坐标为 [(lon, lat), ...]，不支持跨越 180° 经线的区域。
+===============================================================================
+"""
+
+import numpy as np
+
+from geo_hash import MAX_INT_PRECISION, _cell_bounds_np, _ints_to_strings
+
+EARTH_RADIUS = 6371008.8    # 地球平均半径（米）
+
+# 单元格与区域的关系
+OUTSIDE = 0
+PARTIAL = 1
+INSIDE = 2
+
+POLYGON_CHUNK = 4_000_000   # 多边形判断时 单元格数 x 边数 的分块上限，控制内存
+
+
+# =========================
+# 逐级细分
+# =========================
+def _cover(classify, precision, min_precision=1, max_cells=None):
+    """
+    逐级细分得到覆盖单元格
+
+    :param classify: 函数 (lat_min, lon_min, lat_max, lon_max) -> 每个单元格的 OUTSIDE / PARTIAL / INSIDE
+    :param precision: 最细的 geohash 位数（1 到 12）
+    :param min_precision: 最粗的 geohash 位数，更粗的单元格总会继续拆分（优先于 max_cells）
+    :param max_cells: 单元格总数上限，None 表示不限制。只限制 min_precision 以下的细分，
+                      min_precision 位上的单元格数已超过上限时，结果会多于 max_cells
+    :returns: (整数 geohash 数组, 位数数组, 状态数组)，状态为 INSIDE 或 PARTIAL
+    """
+    if not 1 <= min_precision <= precision <= MAX_INT_PRECISION:
+        raise ValueError(f'require 1 <= min_precision <= precision <= {MAX_INT_PRECISION}')
+
+    done = []   # [(codes, level, states)]
+    n_done = 0
+    codes = np.arange(32, dtype=np.uint64)
+    states = classify(*_cell_bounds_np(codes, 1))
+    codes, states = codes[states != OUTSIDE], states[states != OUTSIDE]
+    level = 1
+
+    while codes.size:
+        # 达到最粗精度后，内部单元格不再细分
+        final = np.full(codes.shape, level == precision)
+        if level >= min_precision:
+            final |= states == INSIDE
+        done.append((codes[final], level, states[final]))
+        n_done += int(final.sum())
+        codes, states = codes[~final], states[~final]
+        if not codes.size:
+            break
+
+        children = (codes[:, None] << np.uint64(5)) | np.arange(32, dtype=np.uint64)
+        # 内部单元格的子单元格都在内部，不必重新判断
+        child_states = np.full(children.shape, INSIDE, dtype=np.int8)
+        partial = states == PARTIAL
+        if partial.any():
+            sub = children[partial]
+            child_states[partial] = classify(*_cell_bounds_np(sub.ravel(), level + 1)).reshape(sub.shape)
+        counts = (child_states != OUTSIDE).sum(axis=1)
+
+        if max_cells is not None and level >= min_precision:
+            # 细分一个单元格使总数增加 (子单元格数 - 1)，优先细分增加少的，直到达到上限
+            order = np.argsort(counts, kind='stable')
+            total = n_done + codes.size + np.cumsum(counts[order] - 1)
+            split = np.zeros(codes.shape, dtype=bool)
+            split[order[total <= max_cells]] = True
+            if not split.all():
+                done.append((codes[~split], level, states[~split]))
+                n_done += int((~split).sum())
+            children, child_states = children[split], child_states[split]
+
+        keep = child_states != OUTSIDE
+        codes, states = children[keep], child_states[keep]
+        level += 1
+
+    if not done:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int8)
+    return (np.concatenate([c for c, _, _ in done]),
+            np.concatenate([np.full(c.size, lv, dtype=np.int64) for c, lv, _ in done]),
+            np.concatenate([s for _, _, s in done]).astype(np.int8))
+
+
+def _expand_to(codes, levels, precision):
+    """把较粗的单元格展开为 precision 位的全部子单元格，返回排序后的整数 geohash"""
+    parts = []
+    for level in np.unique(levels).tolist():
+        k = precision - level
+        sub = np.arange(32 ** k, dtype=np.uint64)
+        parts.append(((codes[levels == level][:, None] << np.uint64(5 * k)) | sub).ravel())
+    return np.sort(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.uint64)
+
+
+def _to_geohashes(codes, levels):
+    """混合位数的整数 geohash -> 排序后的字符串列表"""
+    result = []
+    for level in np.unique(levels).tolist():
+        result += _ints_to_strings(codes[levels == level], level).tolist()
+    return sorted(result)
+
+
+# =========================
+# 区域判断
+# =========================
+def _haversine_np(lat1, lon1, lat2, lon2):
+    """球面距离（米），输入为弧度"""
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _circle_classifier(lat, lon, radius):
+    """
+    圆形区域判断
+    单元格到圆心的最近 / 最远点只可能在：四个角、经线边上 d(距离)/d(纬度)=0 的点，
+    以及圆心经度落在单元格内时同经度上的最近点（沿纬线方向距离随经度差单调增加）
+    """
+    lat0, lon0 = np.radians(lat), np.radians(lon)
+
+    def classify(lat_min, lon_min, lat_max, lon_max):
+        lat_min, lat_max = np.radians(lat_min), np.radians(lat_max)
+        lon_min, lon_max = np.radians(lon_min), np.radians(lon_max)
+        near = np.full(lat_min.shape, np.inf)
+        far = np.zeros(lat_min.shape)
+        for edge in (lon_min, lon_max):
+            for corner in (lat_min, lat_max):
+                d = _haversine_np(lat0, lon0, corner, edge)
+                near, far = np.minimum(near, d), np.maximum(far, d)
+            # 经线边上距离的极值点：tan(lat) = tan(lat0) / cos(dlon)
+            with np.errstate(divide='ignore'):
+                critical = np.arctan(np.sin(lat0) / (np.cos(lat0) * np.cos(lon0 - edge)))
+            on_edge = (critical >= lat_min) & (critical <= lat_max)
+            d = _haversine_np(lat0, lon0, critical, edge)
+            near = np.where(on_edge, np.minimum(near, d), near)
+            far = np.where(on_edge, np.maximum(far, d), far)
+        in_lon = (lon_min <= lon0) & (lon0 <= lon_max)
+        d = np.abs(np.clip(lat0, lat_min, lat_max) - lat0) * EARTH_RADIUS
+        near = np.where(in_lon, np.minimum(near, d), near)
+
+        states = np.full(lat_min.shape, PARTIAL, dtype=np.int8)
+        states[near > radius] = OUTSIDE
+        states[far <= radius] = INSIDE
+        return states
+
+    return classify
+
+
+def _bbox_classifier(lat_min_q, lon_min_q, lat_max_q, lon_max_q):
+    """矩形区域判断，单元格按 [min, max) 处理，只和区域边界相接的单元格不算相交"""
+
+    def classify(lat_min, lon_min, lat_max, lon_max):
+        states = np.full(lat_min.shape, PARTIAL, dtype=np.int8)
+        outside = (lat_min > lat_max_q) | (lat_max <= lat_min_q) | (lon_min > lon_max_q) | (lon_max <= lon_min_q)
+        inside = (lat_min >= lat_min_q) & (lat_max <= lat_max_q) & (lon_min >= lon_min_q) & (lon_max <= lon_max_q)
+        states[inside] = INSIDE
+        states[outside] = OUTSIDE
+        return states
+
+    return classify
+
+
+def _polygon_edges(polygon, holes=None):
+    """多边形（及洞）的所有边，返回 (x1, y1, x2, y2) 四个数组"""
+    rings = [polygon] + list(holes or [])
+    x1, y1, x2, y2 = [], [], [], []
+    for ring in rings:
+        ring = np.asarray(ring, dtype=np.float64)
+        if ring.ndim != 2 or ring.shape[0] < 3 or ring.shape[1] != 2:
+            raise ValueError('polygon ring must be a sequence of at least 3 (lon, lat) points')
+        nxt = np.roll(ring, -1, axis=0)
+        x1.append(ring[:, 0])
+        y1.append(ring[:, 1])
+        x2.append(nxt[:, 0])
+        y2.append(nxt[:, 1])
+    return tuple(np.concatenate(v) for v in (x1, y1, x2, y2))
+
+
+def _points_in_polygon_np(x, y, edges):
+    """射线法（奇偶规则）批量判断点是否在多边形内，洞自动排除"""
+    x1, y1, x2, y2 = edges
+    x, y = x[:, None], y[:, None]
+    crosses = (y1 > y) != (y2 > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return ((crosses & (x < x_cross)).sum(axis=1) % 2) == 1
+
+
+def _edges_hit_boxes_np(lat_min, lon_min, lat_max, lon_max, edges):
+    """判断每个矩形是否与任意一条边相交（含边在矩形内部的情况）"""
+    x1, y1, x2, y2 = edges
+    lat_min, lon_min, lat_max, lon_max = (v[:, None] for v in (lat_min, lon_min, lat_max, lon_max))
+    overlap = ((np.minimum(x1, x2) <= lon_max) & (np.maximum(x1, x2) >= lon_min)
+               & (np.minimum(y1, y2) <= lat_max) & (np.maximum(y1, y2) >= lat_min))
+    # 矩形的四个角不全在边所在直线的同一侧
+    dx, dy = x2 - x1, y2 - y1
+    sides = [dx * (cy - y1) - dy * (cx - x1)
+             for cx in (lon_min, lon_max) for cy in (lat_min, lat_max)]
+    all_pos = np.logical_and.reduce([s > 0 for s in sides])
+    all_neg = np.logical_and.reduce([s < 0 for s in sides])
+    return (overlap & ~all_pos & ~all_neg).any(axis=1)
+
+
+def _polygon_classifier(polygon, holes=None):
+    """
+    多边形区域判断：与任意边相交的单元格为 PARTIAL，
+    否则单元格整体在多边形内或外，用单元格中心点判断
+    """
+    edges = _polygon_edges(polygon, holes)
+    chunk = max(1, POLYGON_CHUNK // edges[0].size)
+
+    def classify(lat_min, lon_min, lat_max, lon_max):
+        states = np.empty(lat_min.shape, dtype=np.int8)
+        for start in range(0, lat_min.size, chunk):
+            part = slice(start, start + chunk)
+            box = (lat_min[part], lon_min[part], lat_max[part], lon_max[part])
+            hit = _edges_hit_boxes_np(*box, edges)
+            inside = _points_in_polygon_np((box[1] + box[3]) / 2, (box[0] + box[2]) / 2, edges)
+            states[part] = np.where(hit, PARTIAL, np.where(inside, INSIDE, OUTSIDE))
+        return states
+
+    return classify
+
+
+# =========================
+# 对外接口
+# =========================
+def cover_circle(lat, lon, radius, precision, min_precision=1, max_cells=None):
+    """
+    覆盖以 (lat, lon) 为圆心、radius 米为半径的圆
+
+    :param lat: 圆心纬度
+    :param lon: 圆心经度
+    :param radius: 半径（米）
+    :param precision: 边界单元格的 geohash 位数（最细），1 到 12
+    :param min_precision: 内部单元格的最少位数（最粗）
+    :param max_cells: 单元格数量上限（尽力而为，min_precision 优先，见 _cover）
+    :returns: 排序后的 geohash 列表（位数可能不同）
+    """
+    codes, levels, _ = _cover(_circle_classifier(lat, lon, radius), precision, min_precision, max_cells)
+    return _to_geohashes(codes, levels)
+
+
+def cover_bbox(lat_min, lon_min, lat_max, lon_max, precision, min_precision=1, max_cells=None):
+    """
+    覆盖矩形区域 [lat_min, lat_max] x [lon_min, lon_max]，参数含义同 cover_circle
+    """
+    if lat_min > lat_max or lon_min > lon_max:
+        raise ValueError('Invalid bbox')
+    codes, levels, _ = _cover(_bbox_classifier(lat_min, lon_min, lat_max, lon_max),
+                              precision, min_precision, max_cells)
+    return _to_geohashes(codes, levels)
+
+
+def cover_polygon(polygon, precision, min_precision=1, max_cells=None, holes=None):
+    """
+    覆盖多边形区域，参数含义同 cover_circle
+
+    :param polygon: 外环 [(lon, lat), ...]，首尾不必重复
+    :param holes: 洞的列表，每个洞格式同 polygon
+    """
+    codes, levels, _ = _cover(_polygon_classifier(polygon, holes), precision, min_precision, max_cells)
+    return _to_geohashes(codes, levels)
+
+
+def polyfill(polygon, precision, holes=None, compact=False):
+    """
+    用 geohash 单元格填充多边形，并区分内部单元格与边界单元格
+
+    从 1 位开始逐级细分：完全在多边形内的单元格整体接受，完全在外的剪掉，
+    只有与边界相交的单元格继续细分，到 precision 位时仍与边界相交的即为边界单元格。
+    点落在内部单元格时一定在多边形内，只有落在边界单元格的点需要做精确的点在多边形内判断。
+
+    :param polygon: 外环 [(lon, lat), ...]
+    :param precision: geohash 位数，1 到 12
+    :param holes: 洞的列表，每个洞格式同 polygon
+    :param compact: 为 True 时内部单元格保持细分时的粗粒度（位数不一），否则全部展开为 precision 位
+    :returns: (interior, boundary) 两个排序后的 geohash 列表
+    """
+    codes, levels, states = _cover(_polygon_classifier(polygon, holes), precision)
+    inside = states == INSIDE
+    boundary = _ints_to_strings(np.sort(codes[~inside]), precision).tolist()
+    if compact:
+        return _to_geohashes(codes[inside], levels[inside]), boundary
+    interior = _ints_to_strings(_expand_to(codes[inside], levels[inside], precision), precision).tolist()
+    return interior, boundary
+
+
+if __name__ == "__main__":
+    import time
+
+    from geo_hash import encode, expanding
+
+    lat, lon, radius, precision = 39.93, 116.39, 2000, 7
+
+    print("=" * 70)
+    print(f"半径 {radius} 米的圆，geohash 精度 {precision}")
+    print("=" * 70)
+
+    # 固定精度：圈数要按单元格尺寸估计，且只能是正方形
+    cell_h = 180.0 / 2 ** (5 * precision // 2) * 111_195
+    num = int(np.ceil(radius / cell_h))
+    start_time = time.time()
+    fixed = expanding(encode(lat, lon, precision), num)
+    print(f"固定精度 + expanding({num} 圈): {len(fixed):>6} 个单元格，耗时 {(time.time() - start_time) * 1000:.2f} 毫秒")
+
+    for max_cells in (None, 200, 50):
+        start_time = time.time()
+        cells = cover_circle(lat, lon, radius, precision, max_cells=max_cells)
+        elapsed = (time.time() - start_time) * 1000
+        sizes = {n: sum(len(c) == n for c in cells) for n in sorted({len(c) for c in cells})}
+        print(f"cover_circle(max_cells={max_cells}): {len(cells):>6} 个单元格，各位数数量 {sizes}，耗时 {elapsed:.2f} 毫秒")
+
+    print("\n" + "=" * 70)
+    print("多边形覆盖")
+    print("=" * 70)
+    polygon = [(116.30, 39.88), (116.46, 39.86), (116.50, 39.95), (116.41, 40.01), (116.32, 39.97)]
+    for precision in (6, 7, 8):
+        start_time = time.time()
+        cells = cover_polygon(polygon, precision)
+        elapsed = (time.time() - start_time) * 1000
+        print(f"精度 {precision}: {len(cells):>6} 个单元格，耗时 {elapsed:.2f} 毫秒")
+
+    print("\n" + "=" * 70)
+    print("polyfill：逐个单元格中心判断 vs 逐级细分")
+    print("=" * 70)
+    from geo_hash import _encode_ints_np, _split_bits
+
+    precision = 7
+    edges = _polygon_edges(polygon)
+    xs, ys = np.array(polygon).T
+    start_time = time.time()
+    # 原方式：多边形外包矩形内的全部单元格，逐个判断中心点是否在多边形内
+    n_lon, n_lat = _split_bits(precision)
+    lon_w, lat_w = 360.0 / 2 ** n_lon, 180.0 / 2 ** n_lat
+    lon_c = (np.arange(np.floor((xs.min() + 180) / lon_w), np.ceil((xs.max() + 180) / lon_w)) + 0.5) * lon_w - 180
+    lat_c = (np.arange(np.floor((ys.min() + 90) / lat_w), np.ceil((ys.max() + 90) / lat_w)) + 0.5) * lat_w - 90
+    grid_lon, grid_lat = (v.ravel() for v in np.meshgrid(lon_c, lat_c))
+    in_poly = np.concatenate([_points_in_polygon_np(grid_lon[i:i + 20_000], grid_lat[i:i + 20_000], edges)
+                              for i in range(0, grid_lat.size, 20_000)])
+    centre_cells = _encode_ints_np(grid_lat[in_poly], grid_lon[in_poly], precision)
+    print(f"中心点判断: 候选 {grid_lat.size:,} 个单元格，命中 {centre_cells.size:,} 个，"
+          f"耗时 {(time.time() - start_time) * 1000:.2f} 毫秒（不区分内部 / 边界）")
+
+    start_time = time.time()
+    interior, boundary = polyfill(polygon, precision)
+    print(f"polyfill:   内部 {len(interior):,} 个 + 边界 {len(boundary):,} 个单元格，"
+          f"耗时 {(time.time() - start_time) * 1000:.2f} 毫秒")
+    start_time = time.time()
+    interior_c, _ = polyfill(polygon, precision, compact=True)
+    print(f"polyfill(compact=True): 内部 {len(interior_c):,} 个单元格，耗时 {(time.time() - start_time) * 1000:.2f} 毫秒")
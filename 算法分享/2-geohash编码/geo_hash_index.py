@@ -0,0 +1,272 @@
+"""
+===============================================================================
+  功能描述:
+      基于整数 geohash 的内存空间索引，基于 geo_hash / geo_hash_cover
+      - 点按 precision 位整数 geohash（uint64）排序存放在 numpy 数组中（codes / ids / lats / lons）
+      - 同一前缀的单元格在排序数组中是一段连续区间，用 searchsorted 二分即可取出
+      - 插入、删除先进入缓冲区，攒够 buffer_size 条或查询前再一次性合并，避免每次都整体重排
+      - 矩形 / 半径查询：用 geo_hash_cover 得到混合精度的覆盖单元格，按前缀区间取候选点，
+        完全在区域内的单元格直接命中，边界单元格再逐点精确判断
+      - k 近邻：逐级放大 3x3 单元格块直到候选点不少于 k 个，以第 k 近的距离为半径再做一次半径查询
+
+  用法示例:
+      index = GeoHashIndex()
+      index.insert(ids, lats, lons)
+      index.delete([3, 5])
+      ids = index.query_bbox(39.9, 116.3, 40.0, 116.5)
+      ids, dists = index.query_radius(39.93, 116.39, 1000, return_distance=True)
+      ids, dists = index.knn(39.93, 116.39, k=10)
+===============================================================================
+"""
+
+import numpy as np
+
+from geo_hash import MAX_INT_PRECISION, _cell_offsets, _encode_ints_np, encode_int
+from geo_hash_cover import INSIDE, _bbox_classifier, _circle_classifier, _cover, _haversine_np
+
+DEFAULT_BUFFER_SIZE = 65_536
+DEFAULT_MAX_CELLS = 64        # 查询时覆盖单元格数上限（即二分查找的区间数）
+_BLOCK_OFFSETS = tuple((d_lon, d_lat) for d_lat in (1, 0, -1) for d_lon in (-1, 0, 1))
+
+
+def _ranges_to_indices(starts, stops):
+    """把若干 [start, stop) 区间展开为下标数组"""
+    lengths = stops - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.intp)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(total)
+
+
+class GeoHashIndex:
+    """
+    排序数组实现的 geohash 点索引
+
+    参数:
+      - precision: 存储的 geohash 位数，1 到 12，默认 12（约 3.7 厘米 x 1.9 厘米）
+      - buffer_size: 插入 / 删除缓冲区大小，达到后自动合并
+    """
+
+    def __init__(self, precision=MAX_INT_PRECISION, buffer_size=DEFAULT_BUFFER_SIZE):
+        if not 1 <= precision <= MAX_INT_PRECISION:
+            raise ValueError(f'precision must be between 1 and {MAX_INT_PRECISION}')
+        self.precision = precision
+        self.buffer_size = buffer_size
+        self.codes = np.zeros(0, dtype=np.uint64)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.lats = np.zeros(0, dtype=np.float64)
+        self.lons = np.zeros(0, dtype=np.float64)
+        self._inserts = []      # [(ids, lats, lons)]
+        self._deletes = []      # [ids]
+        self._pending = 0
+
+    @classmethod
+    def from_arrays(cls, ids, lats, lons, precision=MAX_INT_PRECISION, buffer_size=DEFAULT_BUFFER_SIZE):
+        """批量建立索引"""
+        index = cls(precision, buffer_size)
+        index.insert(ids, lats, lons)
+        index.flush()
+        return index
+
+    def __len__(self):
+        self.flush()
+        return self.ids.size
+
+    # =========================
+    # 插入 / 删除
+    # =========================
+    def insert(self, ids, lats, lons):
+        """插入点（标量或数组），id 重复时各自作为独立的点保存"""
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+        if not ids.size == lats.size == lons.size:
+            raise ValueError('ids, lats and lons must have the same length')
+        self._inserts.append((ids.ravel(), lats.ravel(), lons.ravel()))
+        self._pending += ids.size
+        if self._pending >= self.buffer_size:
+            self.flush()
+
+    def delete(self, ids):
+        """删除给定 id 的全部点（包括尚在缓冲区中的）"""
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        self._inserts = [tuple(v[~np.isin(p_ids, ids)] for v in (p_ids, p_lats, p_lons))
+                         for p_ids, p_lats, p_lons in self._inserts]
+        self._deletes.append(ids)
+        self._pending += ids.size
+        if self._pending >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """把缓冲区中的删除、插入合并到排序数组（先删除后插入）"""
+        if self._deletes:
+            keep = ~np.isin(self.ids, np.concatenate(self._deletes))
+            if not keep.all():
+                self.codes, self.ids, self.lats, self.lons = (
+                    v[keep] for v in (self.codes, self.ids, self.lats, self.lons))
+            self._deletes = []
+        if self._inserts:
+            ids, lats, lons = (np.concatenate(v) for v in zip(*self._inserts))
+            self._inserts = []
+            codes = _encode_ints_np(lats, lons, self.precision)
+            order = np.argsort(codes, kind='stable')
+            codes, ids, lats, lons = codes[order], ids[order], lats[order], lons[order]
+            # 新点已排序，找到各自在原数组中的插入位置后一次性插入
+            pos = np.searchsorted(self.codes, codes, side='right')
+            self.codes = np.insert(self.codes, pos, codes)
+            self.ids = np.insert(self.ids, pos, ids)
+            self.lats = np.insert(self.lats, pos, lats)
+            self.lons = np.insert(self.lons, pos, lons)
+        self._pending = 0
+
+    # =========================
+    # 查询
+    # =========================
+    def _cell_ranges(self, codes, levels):
+        """各前缀单元格在排序数组中的 [start, stop) 区间"""
+        shift = (5 * (self.precision - np.asarray(levels, dtype=np.int64))).astype(np.uint64)
+        codes = np.asarray(codes, dtype=np.uint64)
+        starts = np.searchsorted(self.codes, codes << shift, side='left')
+        stops = np.searchsorted(self.codes, (codes + np.uint64(1)) << shift, side='left')
+        return starts, stops
+
+    def _query_cover(self, classify, max_cells):
+        """按覆盖单元格取候选点，返回 (完全命中的下标, 需要精确判断的下标)"""
+        self.flush()
+        codes, levels, states = _cover(classify, self.precision, max_cells=max_cells)
+        starts, stops = self._cell_ranges(codes, levels)
+        inside = states == INSIDE
+        return (_ranges_to_indices(starts[inside], stops[inside]),
+                _ranges_to_indices(starts[~inside], stops[~inside]))
+
+    def query_bbox(self, lat_min, lon_min, lat_max, lon_max, max_cells=DEFAULT_MAX_CELLS):
+        """返回矩形 [lat_min, lat_max] x [lon_min, lon_max] 内的点 id"""
+        if lat_min > lat_max or lon_min > lon_max:
+            raise ValueError('Invalid bbox')
+        hit, candidates = self._query_cover(_bbox_classifier(lat_min, lon_min, lat_max, lon_max), max_cells)
+        lats, lons = self.lats[candidates], self.lons[candidates]
+        mask = (lats >= lat_min) & (lats <= lat_max) & (lons >= lon_min) & (lons <= lon_max)
+        return np.concatenate([self.ids[hit], self.ids[candidates[mask]]])
+
+    def query_radius(self, lat, lon, radius, max_cells=DEFAULT_MAX_CELLS, return_distance=False):
+        """
+        返回距 (lat, lon) 不超过 radius 米的点 id
+
+        :param return_distance: 为 True 时同时返回距离（米），结果按距离排序
+        """
+        hit, candidates = self._query_cover(_circle_classifier(lat, lon, radius), max_cells)
+        if return_distance:
+            idx = np.concatenate([hit, candidates])
+        else:
+            idx = candidates
+        dists = _haversine_np(np.radians(lat), np.radians(lon), np.radians(self.lats[idx]), np.radians(self.lons[idx]))
+        if not return_distance:
+            return np.concatenate([self.ids[hit], self.ids[idx[dists <= radius]]])
+        mask = dists <= radius
+        idx, dists = idx[mask], dists[mask]
+        order = np.argsort(dists, kind='stable')
+        return self.ids[idx[order]], dists[order]
+
+    def knn(self, lat, lon, k):
+        """
+        k 近邻：返回 (ids, 距离米)，按距离升序
+
+        从 precision 位开始逐级变粗，直到点所在单元格及其 8 邻域内的点不少于 k 个，
+        以这些候选点中第 k 近的距离为半径做一次半径查询，结果是精确的 k 近邻
+        """
+        self.flush()
+        if k <= 0 or not self.codes.size:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        k = min(k, self.codes.size)
+        code = encode_int(lat, lon, self.precision)
+
+        for level in range(self.precision, 0, -1):
+            cells = np.unique(np.array(_cell_offsets(code >> (5 * (self.precision - level)), level, _BLOCK_OFFSETS),
+                                       dtype=np.uint64))
+            starts, stops = self._cell_ranges(cells, level)
+            if int((stops - starts).sum()) >= k:
+                break
+        idx = _ranges_to_indices(starts, stops)
+        if idx.size < k:
+            idx = np.arange(self.codes.size)
+        dists = _haversine_np(np.radians(lat), np.radians(lon), np.radians(self.lats[idx]), np.radians(self.lons[idx]))
+        radius = np.partition(dists, k - 1)[k - 1]
+        # 候选块之外可能有更近的点，再以第 k 近的距离做一次半径查询
+        ids, dists = self.query_radius(lat, lon, radius * (1 + 1e-12), return_distance=True)
+        return ids[:k], dists[:k]
+
+
+# =========================
+# 基准测试：索引 vs 暴力扫描
+# =========================
+def _brute_radius(lats_r, lons_r, ids, lat, lon, radius):
+    dists = _haversine_np(np.radians(lat), np.radians(lon), lats_r, lons_r)
+    return ids[dists <= radius]
+
+
+def _brute_knn(lats_r, lons_r, ids, lat, lon, k):
+    dists = _haversine_np(np.radians(lat), np.radians(lon), lats_r, lons_r)
+    idx = np.argpartition(dists, k - 1)[:k]
+    return ids[idx[np.argsort(dists[idx])]]
+
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='GeoHashIndex 与暴力扫描的性能对比')
+    parser.add_argument('--sizes', default='1000000,10000000',
+                        help='点数，逗号分隔，默认 1000000,10000000（1 亿点约需 6 GB 内存）')
+    parser.add_argument('--queries', type=int, default=20, help='每种查询的次数')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    import time
+
+    args = parse_args()
+    rng = np.random.default_rng(42)
+
+    for n in (int(s) for s in args.sizes.split(',')):
+        print("=" * 70)
+        print(f"{n:,} 个点（中国范围内均匀分布）")
+        print("=" * 70)
+        lats = rng.uniform(18.0, 53.0, n)
+        lons = rng.uniform(73.0, 135.0, n)
+        ids = np.arange(n, dtype=np.int64)
+
+        start_time = time.time()
+        index = GeoHashIndex.from_arrays(ids, lats, lons)
+        print(f"建索引: {time.time() - start_time:.2f} 秒")
+
+        lats_r, lons_r = np.radians(lats), np.radians(lons)
+        q_lats = rng.uniform(20.0, 50.0, args.queries)
+        q_lons = rng.uniform(75.0, 130.0, args.queries)
+        # 半径按点密度选取，使每次查询命中约 1000 个点
+        radius = np.sqrt(1000 / n * 35 * 62 / np.pi) * 111_195 * 0.9
+
+        tests = (
+            (f"半径 {radius:,.0f} 米",
+             lambda la, lo: index.query_radius(la, lo, radius),
+             lambda la, lo: _brute_radius(lats_r, lons_r, ids, la, lo, radius)),
+            ("矩形 0.1°x0.1°",
+             lambda la, lo: index.query_bbox(la, lo, la + 0.1, lo + 0.1),
+             lambda la, lo: ids[(lats >= la) & (lats <= la + 0.1) & (lons >= lo) & (lons <= lo + 0.1)]),
+            ("k 近邻 k=10",
+             lambda la, lo: index.knn(la, lo, 10)[0],
+             lambda la, lo: _brute_knn(lats_r, lons_r, ids, la, lo, 10)),
+        )
+        for label, fast, brute in tests:
+            times, results = [], []
+            for func in (fast, brute):
+                start_time = time.perf_counter()
+                results.append([func(la, lo) for la, lo in zip(q_lats, q_lons)])
+                times.append((time.perf_counter() - start_time) / args.queries)
+            same = all(np.array_equal(np.sort(a), np.sort(b)) for a, b in zip(*results))
+            print(f"{label:<18} 索引 {times[0] * 1000:8.3f} 毫秒/次  暴力扫描 {times[1] * 1000:9.2f} 毫秒/次  "
+                  f"快 {times[1] / times[0]:,.0f}x  结果一致: {same}")
+
+        start_time = time.time()
+        index.insert(ids[:100_000] + n, lats[:100_000], lons[:100_000])
+        index.delete(ids[:100_000])
+        index.flush()
+        print(f"插入 10 万 + 删除 10 万: {time.time() - start_time:.2f} 秒，剩余 {len(index):,} 个点")
@@ -0,0 +1,226 @@
+"""
+===============================================================================
+  功能描述:
+      以整数 geohash 为键的只读磁盘存储，基于 geo_hash 编码
+      - 构建器把 (纬度, 经度, 数据) 编码为 precision 位整数 geohash，排序后写成单个文件
+      - 读取时用 np.memmap 映射文件，打开不需要读入或重建索引，多个进程打开同一文件时
+        通过操作系统页缓存共享内存
+      - 同一前缀的记录在文件中连续存放，前缀查询只需两次二分查找
+
+  文件格式（小端序）:
+      header   32 字节: magic b'GHST' | version uint32 | precision uint32 | 保留 uint32
+                        | count uint64 | payload_size uint64
+      codes    uint64[count]          排序后的整数 geohash
+      offsets  uint64[count + 1]      第 i 条数据为 payload[offsets[i]:offsets[i + 1]]
+      payload  bytes[payload_size]
+
+  用法示例:
+      build_store('pois.ghs', lats, lons, payloads)              # payloads 为 bytes 列表
+      with GeoHashStore('pois.ghs') as store:
+          for code, data in store.query_prefix('wx4g0'):
+              ...
+          rows = store.query_cells(cover_circle(39.93, 116.39, 500, precision=7))
+===============================================================================
+"""
+
+import numpy as np
+
+from geo_hash import MAX_INT_PRECISION, _encode_ints_np, _strings_to_ints, geohash_to_int
+
+MAGIC = b'GHST'
+VERSION = 1
+HEADER_DTYPE = np.dtype([('magic', 'S4'), ('version', '<u4'), ('precision', '<u4'), ('reserved', '<u4'),
+                         ('count', '<u8'), ('payload_size', '<u8')])
+
+
+class GeoHashStoreBuilder:
+    """
+    构建 geohash 存储文件：先 add 全部记录，再 build 一次性排序写出
+
+    参数:
+      - path: 输出文件路径
+      - precision: geohash 位数，1 到 12
+    """
+
+    def __init__(self, path, precision=MAX_INT_PRECISION):
+        if not 1 <= precision <= MAX_INT_PRECISION:
+            raise ValueError(f'precision must be between 1 and {MAX_INT_PRECISION}')
+        self.path = path
+        self.precision = precision
+        self._lats = []
+        self._lons = []
+        self._payloads = []
+
+    def add(self, lat, lon, payload):
+        """添加一条记录，payload 为 bytes"""
+        self._lats.append(lat)
+        self._lons.append(lon)
+        self._payloads.append(bytes(payload))
+
+    def add_many(self, lats, lons, payloads):
+        """批量添加记录"""
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+        payloads = [bytes(p) for p in payloads]
+        if not lats.size == lons.size == len(payloads):
+            raise ValueError('lats, lons and payloads must have the same length')
+        self._lats.extend(lats.tolist())
+        self._lons.extend(lons.tolist())
+        self._payloads.extend(payloads)
+
+    def build(self):
+        """排序并写出文件，返回记录数"""
+        codes = _encode_ints_np(self._lats, self._lons, self.precision)
+        order = np.argsort(codes, kind='stable')
+        payloads = [self._payloads[i] for i in order.tolist()]
+        lengths = np.fromiter((len(p) for p in payloads), dtype=np.uint64, count=len(payloads))
+        offsets = np.zeros(len(payloads) + 1, dtype='<u8')
+        np.cumsum(lengths, out=offsets[1:])
+
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header['magic'] = MAGIC
+        header['version'] = VERSION
+        header['precision'] = self.precision
+        header['count'] = len(payloads)
+        header['payload_size'] = offsets[-1]
+        with open(self.path, 'wb') as f:
+            f.write(header.tobytes())
+            f.write(codes[order].astype('<u8').tobytes())
+            f.write(offsets.tobytes())
+            f.write(b''.join(payloads))
+        return len(payloads)
+
+
+def build_store(path, lats, lons, payloads, precision=MAX_INT_PRECISION):
+    """一次性构建存储文件，返回记录数"""
+    builder = GeoHashStoreBuilder(path, precision)
+    builder.add_many(lats, lons, payloads)
+    return builder.build()
+
+
+class GeoHashStore:
+    """
+    内存映射的只读 geohash 存储
+    codes / offsets 是映射到文件上的 numpy 数组，打开文件时不读取数据
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mm = np.memmap(path, dtype=np.uint8, mode='r')
+        if self._mm.size < HEADER_DTYPE.itemsize:
+            raise ValueError(f'Invalid geohash store file: {path}')
+        header = self._mm[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)[0]
+        if header['magic'] != MAGIC or header['version'] != VERSION:
+            raise ValueError(f'Invalid geohash store file: {path}')
+        self.precision = int(header['precision'])
+        count = int(header['count'])
+
+        start = HEADER_DTYPE.itemsize
+        self.codes = self._mm[start:start + 8 * count].view('<u8')
+        start += 8 * count
+        self.offsets = self._mm[start:start + 8 * (count + 1)].view('<u8')
+        start += 8 * (count + 1)
+        self.payload = self._mm[start:start + int(header['payload_size'])]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """释放内存映射"""
+        self.codes = self.offsets = self.payload = self._mm = None
+
+    def __len__(self):
+        return self.codes.size
+
+    def __getitem__(self, i):
+        """第 i 条记录的 payload（按 geohash 排序后的位置）"""
+        return self.payload[int(self.offsets[i]):int(self.offsets[i + 1])].tobytes()
+
+    def prefix_range(self, code, level):
+        """level 位整数 geohash 前缀对应的记录区间 [start, stop)"""
+        if not 1 <= level <= self.precision:
+            raise ValueError(f'prefix length must be between 1 and {self.precision}')
+        shift = np.uint64(5 * (self.precision - level))
+        code = np.uint64(code)
+        start = int(np.searchsorted(self.codes, code << shift, side='left'))
+        stop = int(np.searchsorted(self.codes, (code + np.uint64(1)) << shift, side='left'))
+        return start, stop
+
+    def _iter_range(self, start, stop):
+        offsets = self.offsets[start:stop + 1].tolist()
+        for i, code in enumerate(self.codes[start:stop].tolist()):
+            yield code, self.payload[offsets[i]:offsets[i + 1]].tobytes()
+
+    def query_prefix(self, geohash):
+        """返回 geohash 前缀下的全部记录 [(整数 geohash, payload), ...]"""
+        return list(self._iter_range(*self.prefix_range(geohash_to_int(geohash), len(geohash))))
+
+    def query_cells(self, geohashes):
+        """
+        返回多个单元格（位数可以不同，如 geo_hash_cover 的结果）下的全部记录
+        单元格之间不应互相包含，否则记录会重复返回
+        """
+        if not len(geohashes):
+            return []
+        codes, lengths = _strings_to_ints(geohashes)
+        if np.any(lengths > self.precision):
+            raise ValueError(f'prefix length must be between 1 and {self.precision}')
+        shift = (5 * (self.precision - lengths.astype(np.int64))).astype(np.uint64)
+        starts = np.searchsorted(self.codes, codes << shift, side='left')
+        stops = np.searchsorted(self.codes, (codes + np.uint64(1)) << shift, side='left')
+        result = []
+        for start, stop in zip(starts.tolist(), stops.tolist()):
+            result.extend(self._iter_range(start, stop))
+        return result
+
+
+if __name__ == "__main__":
+    import json
+    import os
+    import tempfile
+    import time
+
+    from geo_hash import encode_many
+    from geo_hash_cover import cover_circle
+
+    rng = np.random.default_rng(42)
+    n = 1_000_000
+    lats = rng.uniform(39.4, 40.4, n)
+    lons = rng.uniform(115.8, 117.0, n)
+    payloads = [json.dumps({'id': i}).encode() for i in range(n)]
+    path = os.path.join(tempfile.gettempdir(), 'geo_hash_store_demo.ghs')
+
+    print("=" * 70)
+    print(f"{n:,} 条记录的 geohash 存储")
+    print("=" * 70)
+
+    start_time = time.time()
+    build_store(path, lats, lons, payloads)
+    print(f"构建: {time.time() - start_time:.2f} 秒，文件 {os.path.getsize(path) / 2 ** 20:.1f} MB")
+
+    # 原方式：每次启动都从原始数据重建索引
+    start_time = time.time()
+    codes = np.sort(_encode_ints_np(lats, lons, MAX_INT_PRECISION))
+    print(f"从原始数据重建（仅编码 + 排序）: {(time.time() - start_time) * 1000:.1f} 毫秒")
+
+    start_time = time.time()
+    store = GeoHashStore(path)
+    print(f"打开（内存映射）: {(time.time() - start_time) * 1000:.3f} 毫秒")
+
+    prefixes = encode_many(rng.uniform(39.5, 40.3, 1000), rng.uniform(116.0, 116.8, 1000), 6).tolist()
+    start_time = time.perf_counter()
+    hits = sum(len(store.query_prefix(p)) for p in prefixes)
+    elapsed = (time.perf_counter() - start_time) / len(prefixes)
+    print(f"6 位前缀查询: {elapsed * 1e6:.1f} 微秒/次，平均 {hits / len(prefixes):.1f} 条")
+
+    cells = cover_circle(39.93, 116.39, 1000, precision=7)
+    start_time = time.perf_counter()
+    rows = store.query_cells(cells)
+    print(f"半径 1000 米覆盖（{len(cells)} 个单元格）查询: {(time.perf_counter() - start_time) * 1000:.2f} 毫秒，"
+          f"{len(rows)} 条")
+
+    store.close()
+    os.remove(path)
@@ -1,7 +1,10 @@
 from shapely.geometry import Point, Polygon
 from shapely.geometry.collection import GeometryCollection
+import numpy as np
 import time
 
+QUERY_CHUNK_SIZE = 1_000_000    # 批量查询时每次创建的点几何体数量，控制内存
+
 
 class PolygonIndexWithBounds:
     """
@@ -94,11 +97,49 @@ class PolygonIndexWithRtree:
         
         return result
     
+    def query_points(self, lons, lats, predicate='within'):
+        """
+        批量查询点所在的多边形：整批点一次 tree.query，R树过滤和精确判断都在 shapely 的 C 代码中完成
+        
+        参数:
+            lons, lats: 点的经度、纬度数组
+            predicate: 'within'（点在多边形内部，同 contains）或 'intersects'（含边界）
+        
+        返回:
+            (point_idx, polygon_idx) 两个整数数组，按点序号、多边形序号排序；
+            polygon_idx 对应 self.name_list / self.geometry_list
+        """
+        from shapely import points
+        
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        if lons.size != lats.size:
+            raise ValueError('lons and lats must have the same length')
+        
+        point_idx, polygon_idx = [], []
+        for start in range(0, lons.size, QUERY_CHUNK_SIZE):
+            geoms = points(lons[start:start + QUERY_CHUNK_SIZE], lats[start:start + QUERY_CHUNK_SIZE])
+            pairs = self.tree.query(geoms, predicate=predicate)
+            point_idx.append(pairs[0] + start)
+            polygon_idx.append(pairs[1])
+        if not point_idx:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        point_idx, polygon_idx = np.concatenate(point_idx), np.concatenate(polygon_idx)
+        order = np.lexsort((polygon_idx, point_idx))
+        return point_idx[order], polygon_idx[order]
+    
     def find_points_in_polygons_batch(self, points_list):
-        """批量查询"""
+        """批量查询（基于 query_points，每个点的多边形按加入索引的顺序排列）"""
+        points_list = list(points_list)
+        coords = np.array(points_list, dtype=np.float64).reshape(-1, 2)
+        point_idx, polygon_idx = self.query_points(coords[:, 0], coords[:, 1])
+        
+        # 按点分组：point_idx 已排序，每个点的结果是连续的一段
+        bounds = np.searchsorted(point_idx, np.arange(len(points_list) + 1))
+        polygon_idx = polygon_idx.tolist()
         results = []
-        for lon, lat in points_list:
-            polygons = self.find_point_in_polygons(lon, lat)
+        for i, (lon, lat) in enumerate(points_list):
+            polygons = [self.name_list[j] for j in polygon_idx[bounds[i]:bounds[i + 1]]]
             results.append({"point": (lon, lat), "polygons": polygons})
         return results
 
@@ -277,6 +318,19 @@ if __name__ == "__main__":
     print(f"  查询耗时: {time_rtree_query:.3f} 秒")
     print(f"  总耗时:  {time_rtree_build + time_rtree_query:.3f} 秒")
     
+    # 方法4：R树批量查询（一次 query 整批点）
+    print(f"\n[方法4] R树批量查询 - {len(large_polygons)} 个多边形，{len(test_points)} 个查询点")
+    start_time = time.time()
+    batch_results = index_rtree.find_points_in_polygons_batch(test_points)
+    time_batch_query = time.time() - start_time
+    print(f"  查询耗时: {time_batch_query:.3f} 秒")
+    print(f"  总耗时:  {time_rtree_build + time_batch_query:.3f} 秒")
+    same = all(
+        sorted(r["polygons"]) == sorted(index_rtree.find_point_in_polygons(lon, lat))
+        for r, (lon, lat) in zip(batch_results, test_points)
+    )
+    print(f"  与逐点查询结果一致: {same}")
+    
     # 性能对比
     print("\n" + "=" * 70)
     print("性能对比总结:")
@@ -284,6 +338,7 @@ if __name__ == "__main__":
     
     total_bounds = time_bounds_build + time_bounds_query
     total_rtree = time_rtree_build + time_rtree_query
+    total_batch = time_rtree_build + time_batch_query
     
     speedup_bounds = time_no_index / total_bounds
     speedup_rtree = time_no_index / total_rtree
@@ -292,10 +347,33 @@ if __name__ == "__main__":
     print(f"直接遍历:        {time_no_index:.3f}s  (基准)")
     print(f"包围盒索引:      {total_bounds:.3f}s  (快 {speedup_bounds:.1f}x)")
     print(f"R树索引:         {total_rtree:.3f}s  (快 {speedup_rtree:.1f}x)")
+    print(f"R树批量查询:     {total_batch:.3f}s  (快 {time_no_index / total_batch:.1f}x)")
     print(f"\nR树 vs 包围盒:   快 {rtree_vs_bounds:.1f}x")
     print(f"节省时间:       {total_bounds - total_rtree:.3f}s")
     
-    # 示例4：推荐使用方案
+    # 示例4：大批量点标注
+    n_points = 1_000_000
+    print("\n" + "=" * 70)
+    print(f"示例 4: R树批量查询 - {len(large_polygons)} 个多边形，{n_points:,} 个点")
+    print("=" * 70)
+    rng = np.random.default_rng(42)
+    lons = rng.uniform(116.0, 117.0, n_points)
+    lats = rng.uniform(39.5, 40.5, n_points)
+    
+    sample = 10_000
+    start_time = time.time()
+    for lon, lat in zip(lons[:sample].tolist(), lats[:sample].tolist()):
+        index_rtree.find_point_in_polygons(lon, lat)
+    time_loop = (time.time() - start_time) * n_points / sample
+    print(f"逐点查询（按 {sample:,} 点估算）: {time_loop:.2f} 秒")
+    
+    start_time = time.time()
+    point_idx, polygon_idx = index_rtree.query_points(lons, lats)
+    time_bulk = time.time() - start_time
+    print(f"query_points:                 {time_bulk:.2f} 秒，{point_idx.size:,} 个 (点, 多边形) 对，"
+          f"快 {time_loop / time_bulk:.0f}x")
+    
+    # 示例5：推荐使用方案
     print("\n" + "=" * 70)
     print("推荐方案:")
     print("=" * 70)
@@ -303,6 +381,7 @@ if __name__ == "__main__":
     ✓ 多边形 < 100 个：       用简单方法（find_point_in_polygons）
     ✓ 多边形 100-1000 个：    用包围盒索引（PolygonIndexWithBounds）
     ✓ 多边形 > 1000 个：      用R树索引（PolygonIndexWithRtree）【强烈推荐】
+    ✓ 大批量点：              用 PolygonIndexWithRtree.query_points 一次查询整批点
     
     使用R树的优势：
     - 查询速度最快（10-1000倍快于直接遍历）